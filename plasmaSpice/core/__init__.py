@@ -4,6 +4,15 @@ Core components for circuit simulation
 
 from .circuit import Circuit
 from .elements import Component, Resistor, VoltageSource
-from .dae_solver import DAESolver, Solution
+from .solution import Solution
 
-__all__ = ['Circuit', 'Component', 'Resistor', 'VoltageSource', 'DAESolver', 'Solution'] 
\ No newline at end of file
+__all__ = ['Circuit', 'Component', 'Resistor', 'VoltageSource', 'DAESolver', 'Solution']
+
+
+def __getattr__(name):
+    # The DAE solver pulls in Assimulo/SUNDIALS; import it on first use so
+    # that DC-only work does not pay for it
+    if name == 'DAESolver':
+        from . import dae_solver
+        return getattr(dae_solver, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,450 @@
+"""
+Sparse assembly helpers for MNA and DAE system matrices.
+
+Element stamps only ever touch a handful of entries, so instead of writing
+into dense (size x size) arrays the stamps are collected as coordinate
+triplets (row, col, value) and converted to a CSR matrix once. Duplicate
+coordinates are summed by the COO -> CSR conversion, which is exactly the
+accumulation that MNA stamping needs.
+
+Elements of the same type are stamped together: their terminal indices are
+gathered into integer arrays (ground = -1) and the fixed stamp pattern of
+the type is generated with NumPy instead of one Python call per element.
+An ElementGroup keeps these index arrays between assemblies, so repeated
+solves of the same topology skip the per-element gathering.
+"""
+
+import copy
+import threading
+from collections import OrderedDict
+from operator import attrgetter
+
+import numpy as np
+import scipy.sparse as sp
+
+
+class TripletMatrix:
+    """Coordinate-format accumulator for element stamps."""
+
+    def __init__(self, size):
+        """
+        Initialize an empty square triplet matrix.
+
+        Args:
+            size (int): Number of rows and columns
+        """
+        self.shape = (size, size)
+        self.rows = []
+        self.cols = []
+        self.vals = []
+        self._blocks = []
+
+    def add(self, row, col, value):
+        """Accumulate value at (row, col)."""
+        self.rows.append(row)
+        self.cols.append(col)
+        self.vals.append(value)
+
+    def extend(self, rows, cols, vals):
+        """Accumulate arrays of triplets at once."""
+        self._blocks.append((rows, cols, vals))
+
+    def structure(self):
+        """
+        Coordinates as collected, without concatenating them.
+
+        Returns:
+            tuple: ([(rows, cols) per extend block], (rows, cols) lists of
+                the scalar adds)
+        """
+        return [b[:2] for b in self._blocks], (self.rows, self.cols)
+
+    def values(self):
+        """Concatenate the collected values only."""
+        blocks = self._blocks + [(self.rows, self.cols, self.vals)]
+        return np.concatenate([np.asarray(b[2], dtype=float) for b in blocks])
+
+    def arrays(self):
+        """
+        Concatenate all collected triplets.
+
+        Returns:
+            tuple: (rows, cols, vals) arrays
+        """
+        blocks = self._blocks + [(self.rows, self.cols, self.vals)]
+        rows = np.concatenate([np.asarray(b[0], dtype=np.int64) for b in blocks])
+        cols = np.concatenate([np.asarray(b[1], dtype=np.int64) for b in blocks])
+        vals = np.concatenate([np.asarray(b[2], dtype=float) for b in blocks])
+        return rows, cols, vals
+
+    def tocsr(self):
+        """
+        Assemble the collected triplets.
+
+        Returns:
+            scipy.sparse.csr_matrix: Matrix with duplicate entries summed
+        """
+        rows, cols, vals = self.arrays()
+        return sp.coo_matrix((vals, (rows, cols)), shape=self.shape).tocsr()
+
+
+class CSRPattern:
+    """
+    CSR structure (indptr, indices) of a fixed sequence of triplet coordinates.
+
+    The coordinates are sorted once; every later assembly with the same
+    coordinates only sums the values into the data array with np.bincount.
+    When the triplets are stamped from the same read-only coordinate
+    arrays as last time (cached per topology by the element groups), the
+    coordinates are not even concatenated or compared.
+    """
+
+    def __init__(self, rows, cols, shape):
+        """
+        Args:
+            rows, cols (ndarray): Triplet coordinates, duplicates allowed
+            shape (tuple): Matrix shape
+        """
+        self.shape = shape
+        self.rows = rows
+        self.cols = cols
+        keys = rows * shape[1] + cols
+        unique, self.slot = np.unique(keys, return_inverse=True)
+        self.indices = unique % shape[1]
+        self.indptr = np.searchsorted(unique // shape[1], np.arange(shape[0] + 1))
+        self.source = None
+
+    def copy(self):
+        """Pattern sharing this CSR structure, without a remembered source."""
+        pattern = copy.copy(self)
+        pattern.source = None
+        return pattern
+
+    def remember(self, triplets):
+        """Record the coordinate blocks of triplets that match this pattern."""
+        self.source = triplets.structure()
+
+    def built_from(self, triplets):
+        """
+        True if triplets reuse the remembered coordinate arrays: the same
+        read-only array objects block by block, and equal scalar adds.
+        """
+        if self.source is None:
+            return False
+        blocks, scalars = triplets.structure()
+        ref_blocks, ref_scalars = self.source
+        return (len(blocks) == len(ref_blocks)
+                and all(_frozen_same(a, b) for block, ref in zip(blocks, ref_blocks)
+                        for a, b in zip(block, ref))
+                and scalars == ref_scalars)
+
+    def matches(self, rows, cols):
+        """True if the coordinates are those the pattern was built from."""
+        return np.array_equal(rows, self.rows) and np.array_equal(cols, self.cols)
+
+    def assemble(self, vals):
+        """Sum triplet values into a new CSR matrix with this structure."""
+        data = np.bincount(self.slot, weights=vals, minlength=self.indices.size)
+        return sp.csr_matrix((data, self.indices, self.indptr), shape=self.shape)
+
+
+# Total size of the CSR patterns kept for sharing between circuits; a
+# pattern of a 180k-element mesh takes about 25 MB. Sharing is off (0) by
+# default: each circuit already caches its own patterns across solves
+SHARED_PATTERN_BYTES = 0
+
+
+class PatternCache:
+    """
+    Least-recently-used CSRPattern cache keyed by the triplet coordinates,
+    so circuits with the same topology sort their triplets only once.
+
+    Bounded by the total bytes of the cached arrays and safe to share
+    between threads; patterns are built outside the lock. With
+    max_bytes = 0 every call builds a fresh pattern without hashing the
+    coordinates.
+    """
+
+    def __init__(self, max_bytes=SHARED_PATTERN_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._patterns = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, rows, cols, shape):
+        """
+        Pattern of the coordinates, sharing the structure arrays of a cached
+        pattern built from the same coordinates.
+
+        Returns:
+            CSRPattern: A private copy (see CSRPattern.copy)
+        """
+        if self.max_bytes <= 0:
+            return CSRPattern(rows, cols, shape)
+        key = (shape, rows.size, hash(rows.tobytes()), hash(cols.tobytes()))
+        with self._lock:
+            shared = self._patterns.get(key)
+            if shared is not None and shared.matches(rows, cols):
+                self._patterns.move_to_end(key)
+                return shared.copy()
+
+        pattern = CSRPattern(rows, cols, shape)
+        size = _pattern_bytes(pattern)
+        if size <= self.max_bytes:
+            with self._lock:
+                old = self._patterns.pop(key, None)
+                if old is not None:
+                    self.nbytes -= _pattern_bytes(old)
+                self._patterns[key] = pattern
+                self.nbytes += size
+                while self.nbytes > self.max_bytes:
+                    _, evicted = self._patterns.popitem(last=False)
+                    self.nbytes -= _pattern_bytes(evicted)
+        return pattern.copy()
+
+    def clear(self):
+        """Drop all cached patterns."""
+        with self._lock:
+            self._patterns.clear()
+            self.nbytes = 0
+
+    def __len__(self):
+        return len(self._patterns)
+
+
+def _pattern_bytes(pattern):
+    return sum(a.nbytes for a in (pattern.rows, pattern.cols, pattern.slot,
+                                  pattern.indices, pattern.indptr))
+
+
+# Patterns shared by all circuits; set shared_patterns.max_bytes to opt in
+shared_patterns = PatternCache()
+
+
+def _frozen_same(a, b):
+    return (a is b and isinstance(a, np.ndarray) and not a.flags.writeable)
+
+
+def _freeze(*arrays):
+    for array in arrays:
+        array.flags.writeable = False
+    return arrays
+
+
+class NodeMap(dict):
+    """
+    Node label -> matrix index map that also translates whole arrays.
+
+    Behaves like the plain dict {node: index}; additionally indices(nodes)
+    gives the index of every node in a sequence, -1 for ground (node 0) and
+    for unknown labels. Integer labels are found by binary search in the
+    sorted node numbers, so sparse, huge or negative numbers cost no more
+    than dense ones; other labels (e.g. strings) go through the dict.
+    """
+
+    def __init__(self, sorted_nodes):
+        """
+        Args:
+            sorted_nodes (list): Non-ground node labels in ascending order
+        """
+        super().__init__(zip(sorted_nodes, range(len(sorted_nodes))))
+        keys = np.asarray(sorted_nodes)
+        self.keys = keys if keys.dtype.kind in 'iu' else None
+
+    def indices(self, nodes):
+        """
+        Args:
+            nodes (sequence): Node labels
+
+        Returns:
+            ndarray: int64 matrix index per node, -1 for ground and unknown
+        """
+        values = np.asarray(nodes)
+        if self.keys is not None and values.dtype.kind in 'iu':
+            pos = np.searchsorted(self.keys, values)
+            np.minimum(pos, self.keys.size - 1, out=pos)
+            return np.where(self.keys[pos] == values, pos, -1).astype(np.int64)
+        return np.fromiter((self.get(node, -1) for node in nodes),
+                           dtype=np.int64, count=len(nodes))
+
+
+class ElementGroup(list):
+    """
+    List of elements of one type that caches their matrix index arrays.
+
+    Each cached array is stored with the map it was computed from and is
+    reused while the same map object is passed in again; appending an
+    element drops the cache. Terminals are assumed fixed once an element
+    is added.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.index_cache = {}
+
+    def append(self, element):
+        super().append(element)
+        self.index_cache.clear()
+
+    def cached(self, key, mapping, compute):
+        """
+        Return compute(self, mapping), reused while mapping is unchanged.
+
+        mapping may be a tuple of maps; each must be the same object.
+        """
+        hit = self.index_cache.get(key)
+        if hit is not None and _same_maps(hit[0], mapping):
+            return hit[1]
+        result = compute(self, mapping)
+        self.index_cache[key] = (mapping, result)
+        return result
+
+
+def _same_maps(a, b):
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(x is y for x, y in zip(a, b))
+    return a is b
+
+
+def _node_indices(elements, node_map):
+    entrance = node_map.indices([e.entrance for e in elements])
+    exit = node_map.indices([e.exit for e in elements])
+    entrance.flags.writeable = exit.flags.writeable = False
+    return entrance, exit
+
+
+def _branch_indices(elements, vsrc_map):
+    branch = np.fromiter((vsrc_map[e] for e in elements),
+                         dtype=np.int64, count=len(elements))
+    branch.flags.writeable = False
+    return branch
+
+
+def node_indices(elements, node_map):
+    """
+    Gather matrix indices of the element terminals.
+
+    Args:
+        elements (list): Elements to index; an ElementGroup reuses its
+            cached arrays for the same node_map
+        node_map (NodeMap): Maps node numbers to matrix indices
+
+    Returns:
+        tuple: (entrance indices, exit indices) as read-only int arrays,
+            -1 for ground
+    """
+    return _cached(elements, 'nodes', node_map, _node_indices)
+
+
+def branch_indices(elements, vsrc_map):
+    """Gather the branch current index of each element as an int array."""
+    return _cached(elements, 'branch', vsrc_map, _branch_indices)
+
+
+def conductance_pattern(elements, node_map):
+    """
+    Coordinates of the two-terminal pattern [[g, -g], [-g, g]].
+
+    Depends only on the topology, so an ElementGroup computes it once per
+    node_map; each assembly then only scales the element values into it.
+    Rows/columns of grounded terminals (index -1) are dropped.
+
+    Returns:
+        tuple: (rows, cols, element index, sign) arrays, one entry per
+            matrix contribution
+    """
+    return _cached(elements, 'conductance', node_map, _conductance_pattern)
+
+
+def _conductance_pattern(elements, node_map):
+    entrance, exit = node_indices(elements, node_map)
+    element = np.arange(entrance.size)
+    has_e = entrance >= 0
+    has_x = exit >= 0
+    both = has_e & has_x
+    n_diag = np.count_nonzero(has_e) + np.count_nonzero(has_x)
+    n_both = np.count_nonzero(both)
+    return _freeze(np.concatenate([entrance[has_e], exit[has_x], entrance[both], exit[both]]),
+                   np.concatenate([entrance[has_e], exit[has_x], exit[both], entrance[both]]),
+                   np.concatenate([element[has_e], element[has_x], element[both], element[both]]),
+                   np.concatenate([np.ones(n_diag), -np.ones(2 * n_both)]))
+
+
+def _cached(elements, key, mapping, compute):
+    if isinstance(elements, ElementGroup):
+        return elements.cached(key, mapping, compute)
+    return compute(elements, mapping)
+
+
+def values(elements, attr):
+    """Gather a numeric attribute of each element as a float array."""
+    # map/attrgetter runs the loop in C, without a generator frame per element
+    return np.fromiter(map(attrgetter(attr), elements),
+                       dtype=float, count=len(elements))
+
+
+def stamp_conductance(matrix, pattern, g):
+    """
+    Stamp the two-terminal pattern [[g, -g], [-g, g]] for many elements.
+
+    Args:
+        matrix (TripletMatrix): Accumulator to stamp into
+        pattern (tuple): Coordinates from conductance_pattern
+        g (ndarray): Per-element value (conductance, capacitance)
+    """
+    rows, cols, element, sign = pattern
+    matrix.extend(rows, cols, g[element] * sign)
+
+
+def stamp_incidence(matrix, elements, node_map, vsrc_map, row_sign, col_sign):
+    """
+    Stamp branch-current incidence entries for many elements.
+
+    Adds row_sign to (branch, entrance) and col_sign to (entrance, branch);
+    the exit terminal gets the negated values. The entries are structural
+    (always +-1), so an ElementGroup builds them once per node_map/vsrc_map
+    pair and later assemblies append the cached arrays unchanged.
+    """
+    def pattern(elements, maps):
+        entrance, exit = node_indices(elements, maps[0])
+        branch = branch_indices(elements, maps[1])
+        has_e = entrance >= 0
+        has_x = exit >= 0
+        n_e = np.count_nonzero(has_e)
+        n_x = np.count_nonzero(has_x)
+        return _freeze(
+            np.concatenate([branch[has_e], entrance[has_e], branch[has_x], exit[has_x]]),
+            np.concatenate([entrance[has_e], branch[has_e], exit[has_x], branch[has_x]]),
+            np.concatenate([np.full(n_e, row_sign), np.full(n_e, col_sign),
+                            np.full(n_x, -row_sign), np.full(n_x, -col_sign)]))
+
+    key = ('incidence', row_sign, col_sign)
+    matrix.extend(*_cached(elements, key, (node_map, vsrc_map), pattern))
+
+
+def terminal_voltages(elements, node_map, x):
+    """
+    Voltage entrance - exit of each element from a state vector.
+
+    Args:
+        elements (list): Two-terminal elements
+        node_map (NodeMap): Maps node numbers to matrix indices
+        x (ndarray): State vector, or states as columns (n_states, n_times)
+
+    Returns:
+        ndarray: One voltage per element (rows follow elements)
+    """
+    entrance, exit = node_indices(elements, node_map)
+    n_nodes = len(node_map)
+    # Ground (index -1) reads the zero slot appended after the node voltages
+    v = np.zeros((n_nodes + 1,) + np.shape(x)[1:])
+    v[:n_nodes] = x[:n_nodes]
+    return v[entrance] - v[exit]
+
+
+def stamp_injection(vector, entrance, exit, current):
+    """Subtract current at the entrance rows and add it at the exit rows."""
+    has_e = entrance >= 0
+    has_x = exit >= 0
+    np.add.at(vector, entrance[has_e], -current[has_e])
+    np.add.at(vector, exit[has_x], current[has_x])
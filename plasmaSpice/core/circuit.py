@@ -2,9 +2,90 @@
 Circuit class for Modified Nodal Analysis (MNA) and DAE system analysis.
 """
 
+import logging
 import numpy as np
-from collections import defaultdict
-from .elements import Inductor, Capacitor, VoltageSource
+from bisect import bisect_left
+from scipy.sparse import coo_matrix, diags
+from scipy.linalg import lu_factor, lu_solve
+from scipy.sparse.linalg import LinearOperator, gmres, spilu, splu
+from collections import Counter, defaultdict
+from .assembly import (ElementGroup, NodeMap, TripletMatrix, branch_indices,
+                       shared_patterns, terminal_voltages)
+from .elements import Resistor
+from .solution import DEFAULT_NCP, Solution
+
+logger = logging.getLogger(__name__)
+
+# DC block elimination: maximum number of voltage sources, and the smallest
+# accepted pivot of G relative to the largest one
+SCHUR_MAX_SOURCES = 32
+SCHUR_PIVOT_RATIO = 1e-12
+
+# Mixed-precision DC solve: relative residual to reach and correction limit
+REFINE_TOL = 1e-12
+REFINE_MAX_ITER = 10
+
+# Iterative DC solve: GMRES relative residual, and the drop tolerance /
+# fill factor of its incomplete LU preconditioner
+GMRES_RTOL = 1e-10
+ILU_DROP_TOL = 1e-4
+ILU_FILL_FACTOR = 10
+
+# Conductance to ground added to every node when the DC system is singular
+DC_GMIN = 1e-12
+
+# Fill-reducing ordering for SuperLU. MNA matrices are structurally
+# symmetric, where minimum degree on A^T + A gives far less fill than the
+# default COLAMD (about half on resistor meshes)
+LU_PERMC_SPEC = 'MMD_AT_PLUS_A'
+
+def _factor(matrix):
+    """Sparse LU factorization (SuperLU) of a scipy.sparse matrix."""
+    return splu(matrix.tocsc(), permc_spec=LU_PERMC_SPEC)
+
+def _same_csr(a, b):
+    """True if two CSR matrices have the same structure and values."""
+    return (a.shape == b.shape and np.array_equal(a.indptr, b.indptr)
+            and np.array_equal(a.indices, b.indices)
+            and np.array_equal(a.data, b.data))
+
+def _solve_gmres(matrix, vector):
+    """
+    Solve with GMRES, preconditioned by an incomplete LU factorization.
+    
+    Returns:
+        ndarray: Solution, or None if GMRES does not reach GMRES_RTOL
+    
+    Raises:
+        RuntimeError: If the matrix is exactly singular
+    """
+    ilu = spilu(matrix.tocsc(), drop_tol=ILU_DROP_TOL, fill_factor=ILU_FILL_FACTOR,
+                permc_spec=LU_PERMC_SPEC)
+    preconditioner = LinearOperator(matrix.shape, ilu.solve)
+    x, info = gmres(matrix, vector, rtol=GMRES_RTOL, atol=0.0, M=preconditioner)
+    return x if info == 0 else None
+
+def _solve_refined(matrix, vector):
+    """
+    Solve with a float32 LU factorization plus float64 iterative refinement.
+    
+    Returns:
+        ndarray: Solution, or None if the float32 matrix is singular (e.g. a
+            DC_GMIN regularization lost to rounding) or the residual does not
+            drop below REFINE_TOL * |vector| within REFINE_MAX_ITER corrections
+    """
+    try:
+        lu = _factor(matrix.astype(np.float32))
+    except RuntimeError:
+        return None
+    x = lu.solve(vector.astype(np.float32)).astype(np.float64)
+    target = REFINE_TOL * np.linalg.norm(vector, np.inf)
+    for _ in range(REFINE_MAX_ITER):
+        residual = vector - matrix @ x
+        if np.linalg.norm(residual, np.inf) <= target:
+            return x
+        x += lu.solve(residual.astype(np.float32))
+    return None
 
 class Circuit:
     """Circuit class for both DC and transient analysis."""
@@ -12,11 +93,18 @@ class Circuit:
     def __init__(self):
         """Initialize an empty circuit."""
         self.elements = []          # All circuit elements
-        self.nodes = set()          # Set of all nodes (excluding ground)
-        self.voltage_sources = []   # List of voltage sources
-        self.node_map = {}          # Maps node numbers to matrix indices
+        self.nodes = []             # All nodes (excluding ground), kept sorted
+        self._by_type = {kind: ElementGroup() for kind in 'RCLVI'}  # Elements by kind
+        self.voltage_sources = self._by_type['V']  # List of voltage sources
+        self._by_class = defaultdict(ElementGroup)  # Elements by concrete class, for stamping
+        self.node_map = NodeMap([])  # Maps node numbers to matrix indices
         self.vsrc_map = {}          # Maps voltage sources to matrix indices
         self._algvar_list = []      # Store algebraic and differential variable list
+        self._vsrc_map_dirty = True  # vsrc_map needs rebuilding
+        self._nodes_dirty = False   # A node was added since node_map was built
+        self._patterns = {}         # Cached CSR structure per assembled matrix
+        self._dc_vector_buf = None  # Reused DC RHS vector
+        self._mna_solver = None     # (matrix, solve) of the last factored MNA system
     
     def _update_algvar_list(self):
         """
@@ -31,74 +119,178 @@ class Circuit:
         self._algvar_list = [0] * (n_nodes + n_currents)  # Initialize all variables as algebraic
         
         # Process node voltages - only nodes connected to capacitors are differential
-        for element in self.elements:
-            if isinstance(element, Capacitor):  # Only consider capacitors
-                if element.entrance != 0:
-                    idx = self.node_map[element.entrance]
-                    self._algvar_list[idx] = 1
-                if element.exit != 0:
-                    idx = self.node_map[element.exit]
-                    self._algvar_list[idx] = 1
+        for element in self._by_type['C']:
+            if element.entrance != 0:
+                idx = self.node_map[element.entrance]
+                self._algvar_list[idx] = 1
+            if element.exit != 0:
+                idx = self.node_map[element.exit]
+                self._algvar_list[idx] = 1
         
         # Process voltage source currents (keep as algebraic 0)
         
         # Process inductor currents (differential variables)
-        for element in self.elements:
-            if isinstance(element, Inductor):
-                idx = self.vsrc_map[element]
-                self._algvar_list[idx] = 1
+        for element in self._by_type['L']:
+            idx = self.vsrc_map[element]
+            self._algvar_list[idx] = 1
     
     def add_element(self, element):
+        self._register(element)
+        
+        # Insert new nodes in sorted position (excluding ground node 0)
+        nodes = self.nodes
+        for node in (element.entrance, element.exit):
+            if node != 0:
+                pos = bisect_left(nodes, node)
+                if pos == len(nodes) or nodes[pos] != node:
+                    nodes.insert(pos, node)
+                    self._nodes_dirty = True
+    
+    def add_elements(self, elements):
+        """
+        Add many elements at once.
+        
+        Equivalent to add_element for each element in order, but new nodes
+        are merged into the sorted node list in one pass instead of one list
+        insertion per node, which matters for large generated netlists.
+        
+        Args:
+            elements (iterable): Circuit elements
+        """
+        elements = list(elements)
+        for element in elements:
+            self._register(element)
+        
+        self._merge_nodes([node for element in elements
+                           for node in (element.entrance, element.exit)])
+    
+    def add_resistors(self, names, entrances, exits, resistances):
+        """
+        Add many resistors given as parallel arrays.
+        
+        The node numbers are merged straight from the arrays, without
+        reading them back from the created elements.
+        
+        Args:
+            names (sequence): Resistor names
+            entrances, exits (array_like): Terminal node numbers
+            resistances (array_like): Resistance values in ohms
+        
+        Returns:
+            list: The created Resistor elements
+        """
+        entrances = np.asarray(entrances, dtype=np.int64)
+        exits = np.asarray(exits, dtype=np.int64)
+        resistances = np.asarray(resistances, dtype=float)
+        if not len(names) == entrances.size == exits.size == resistances.size:
+            raise ValueError("names, entrances, exits and resistances must "
+                             "have the same length")
+        
+        conductances = np.reciprocal(resistances)
+        resistors = list(map(Resistor.from_conductance, names, entrances.tolist(),
+                             exits.tolist(), conductances.tolist()))
+        for resistor in resistors:
+            self._register(resistor)
+        self._merge_nodes(np.concatenate([entrances, exits]))
+        return resistors
+    
+    def _merge_nodes(self, terminals):
+        """
+        Merge terminal node labels into the sorted node list.
+        
+        Integer labels are merged with NumPy set operations; other labels
+        (e.g. strings) fall back to Python sets.
+        """
+        array = np.asarray(terminals)
+        nodes = np.asarray(self.nodes)
+        if array.dtype.kind in 'iu' and (nodes.dtype.kind in 'iu' or not self.nodes):
+            nodes = nodes.astype(np.int64)
+            new = np.setdiff1d(array[array != 0], nodes)
+            if new.size:
+                self.nodes[:] = np.union1d(nodes, new).tolist()
+                self._nodes_dirty = True
+            return
+        new = set(terminals).difference(self.nodes, (0,))
+        if new:
+            self.nodes[:] = sorted(new.union(self.nodes))
+            self._nodes_dirty = True
+    
+    def _register(self, element):
+        """Append an element and its type buckets (without its nodes)."""
         # Direction validation
         if element.entrance == 0 and element.exit != 0:
-            print(f"Warning: Resistor {element.name} has ground node as entrance. "
-                    "Consider swapping entrance/exit nodes for consistency.")
+            logger.warning("%s has ground node as entrance. "
+                           "Consider swapping entrance/exit nodes for consistency.",
+                           element.name)
     
         self.elements.append(element)
         
-        # Add nodes to the set (excluding ground node 0)
-        if element.entrance != 0:
-            self.nodes.add(element.entrance)
-        if element.exit != 0:
-            self.nodes.add(element.exit)
-        
-        # Voltage source processing
-        if isinstance(element, VoltageSource):
-            self.voltage_sources.append(element)
+        # Type-indexed buckets (voltage sources land in self.voltage_sources)
+        bucket = self._by_type.get(element.kind)
+        if bucket is not None:
+            bucket.append(element)
+        self._by_class[type(element)].append(element)
         
-        # Update variable type list
-        self._update_algvar_list()
+        # Maps (and the algvar list) are rebuilt lazily on the next analysis
+        self._vsrc_map_dirty = True
     
     def _build_maps(self):
         """
         Build mappings between nodes/sources and matrix indices.
         
-        For DAE system:
+        DC and DAE analysis share this layout (inductors are zero-volt
+        sources in DC):
         1. node_map: maps nodes to voltage indices
         2. vsrc_map: maps voltage sources and inductors to current indices
            - Voltage sources come first
            - Inductors follow voltage sources
         
+        The maps are cached until the next add_element call, so the element
+        groups can keep their index arrays for the same map objects.
+        
         Returns:
             tuple: (number of nodes, number of voltage sources + inductors)
         """
         # Map nodes to indices (excluding ground node 0)
-        sorted_nodes = sorted(list(self.nodes))
-        self.node_map = {node: idx for idx, node in enumerate(sorted_nodes)}
-        
-        # First map voltage sources
-        vsrc_start_idx = len(sorted_nodes)
-        self.vsrc_map = {}
-        for idx, src in enumerate(self.voltage_sources):
-            self.vsrc_map[src] = vsrc_start_idx + idx
-        
-        # Then map inductors
-        inductor_start_idx = vsrc_start_idx + len(self.voltage_sources)
-        inductors = [elem for elem in self.elements if isinstance(elem, Inductor)]
-        for idx, ind in enumerate(inductors):
-            self.vsrc_map[ind] = inductor_start_idx + idx
-        
-        return len(sorted_nodes), len(self.voltage_sources) + len(inductors)
+        n_nodes = self._update_node_map()
+        
+        if self._vsrc_map_dirty:
+            # First map voltage sources
+            vsrc_start_idx = n_nodes
+            self.vsrc_map = {}
+            for idx, src in enumerate(self.voltage_sources):
+                self.vsrc_map[src] = vsrc_start_idx + idx
+            
+            # Then map inductors
+            inductor_start_idx = vsrc_start_idx + len(self.voltage_sources)
+            for idx, ind in enumerate(self._by_type['L']):
+                self.vsrc_map[ind] = inductor_start_idx + idx
+            self._vsrc_map_dirty = False
+        
+        return n_nodes, len(self.vsrc_map)
+    
+    def _update_node_map(self):
+        """
+        Rebuild node_map if nodes were added since it was last built; adding
+        elements between existing nodes keeps the current map.
+        
+        Returns:
+            int: Number of nodes (excluding ground)
+        """
+        if self._nodes_dirty:
+            self.node_map = NodeMap(self.nodes)
+            self._nodes_dirty = False
+        return len(self.nodes)
+    
+    def _group_by_type(self):
+        """
+        Elements binned by their concrete type so that each type can be
+        stamped in one vectorized call. The bins are filled by add_element.
+        
+        Returns:
+            dict: element class -> list of elements, in insertion order
+        """
+        return self._by_class
     
     def _build_mna_matrix(self, n_nodes, n_vsrc, debug=False):
         """
@@ -107,7 +299,7 @@ class Circuit:
         Args:
             n_nodes (int): Number of nodes (excluding ground)
             n_vsrc (int): Number of voltage sources
-            debug (bool): If True, print debug information
+            debug (bool): If True, log debug information
             
         Returns:
             tuple: (MNA matrix, RHS vector)
@@ -115,98 +307,135 @@ class Circuit:
         # Total size of the MNA matrix
         size = n_nodes + n_vsrc
         
-        if debug:
-            print(f"\nMatrix size: {size}x{size}")
-            print(f"- Number of nodes (excluding ground): {n_nodes}")
-            print(f"- Number of voltage sources: {n_vsrc}")
-            print("\nNode mapping:", self.node_map)
+        if debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Matrix size: %dx%d\n"
+                         "- Number of nodes (excluding ground): %d\n"
+                         "- Number of voltage sources: %d",
+                         size, size, n_nodes, n_vsrc)
+            logger.debug("Node mapping: %s", self.node_map)
             if n_vsrc > 0:
-                print("Voltage source mapping:", 
-                      {src.name: idx for src, idx in self.vsrc_map.items()})
+                logger.debug("Voltage source mapping: %s",
+                             {src.name: idx for src, idx in self.vsrc_map.items()})
         
-        # Initialize MNA matrix and RHS vector
-        matrix = np.zeros((size, size))
-        vector = np.zeros(size)
+        # Collect stamps as sparse triplets; the dense RHS vector is reused
+        # across calls (valid until the next assembly)
+        triplets = TripletMatrix(size)
+        vector = self._dc_vector_buf
+        if vector is None or vector.size != size:
+            vector = self._dc_vector_buf = np.zeros(size)
+        else:
+            vector.fill(0.0)
         
-        # Let each element contribute to the matrix
-        for element in self.elements:
-            element.stamp(matrix, vector, self.node_map, self.vsrc_map)
+        # Let each group of elements contribute to the matrix
+        self._stamp_groups('stamp_many', triplets, vector)
+        
+        matrix = self._assemble('dc', triplets)
         
         if debug and size > 0:
-            print("\nMNA Matrix:")
-            print(matrix)
-            print("\nRHS Vector:")
-            print(vector)
-            
-            if n_nodes > 0 and n_vsrc > 0:
-                print("\nSubmatrices:")
-                print("G (conductances):")
-                print(matrix[:n_nodes, :n_nodes])
-                print("\nB (voltage source connections):")
-                print(matrix[:n_nodes, n_nodes:])
-                print("\nC (transpose of B):")
-                print(matrix[n_nodes:, :n_nodes])
-                print("\nD (should be zero):")
-                print(matrix[n_nodes:, n_nodes:])
+            self._log_mna(matrix, vector, n_nodes, n_vsrc)
         
         return matrix, vector
     
-    def _build_dc_maps(self):
+    def _stamp_groups(self, method, *targets):
         """
-        Build mappings for DC analysis
+        Call the vectorized stamp method of every element group.
+        
+        Args:
+            method (str): 'stamp_many' or 'stamp_dae_many'
+            *targets: TripletMatrix and ndarray accumulators to stamp into
+        """
+        for cls, group in self._group_by_type().items():
+            getattr(cls, method)(group, *targets, self.node_map, self.vsrc_map)
+    
+    def _assemble(self, key, triplets):
+        """
+        Convert triplets to CSR, reusing the sparsity pattern cached under key
+        while the stamped coordinates are unchanged (same topology).
+        """
+        pattern = self._patterns.get(key)
+        if pattern is not None and pattern.built_from(triplets):
+            return pattern.assemble(triplets.values())
+
+        rows, cols, vals = triplets.arrays()
+        if pattern is None or not pattern.matches(rows, cols):
+            pattern = self._patterns[key] = shared_patterns.get(rows, cols, triplets.shape)
+        pattern.remember(triplets)
+        return pattern.assemble(vals)
+    
+    def _log_mna(self, matrix, vector, n_nodes, n_vsrc):
+        """Log the (sparse) MNA matrix, RHS vector and its submatrices."""
+        # Densifying and formatting is O(n^2); skip unless it will be emitted
+        if not logger.isEnabledFor(logging.DEBUG):
+            return
+        
+        dense = matrix.toarray()
+        logger.debug("MNA Matrix:\n%s", dense)
+        logger.debug("RHS Vector:\n%s", vector)
+        
+        if n_nodes > 0 and n_vsrc > 0:
+            logger.debug("Submatrices:\n"
+                         "G (conductances):\n%s\n"
+                         "B (voltage source connections):\n%s\n"
+                         "C (transpose of B):\n%s\n"
+                         "D (should be zero):\n%s",
+                         dense[:n_nodes, :n_nodes], dense[:n_nodes, n_nodes:],
+                         dense[n_nodes:, :n_nodes], dense[n_nodes:, n_nodes:])
+    
+    def solve_dc(self, debug=False, precision='double', method='direct'):
         """
-        # Map nodes to indices
-        sorted_nodes = sorted(list(self.nodes))
-        self.node_map = {node: idx for idx, node in enumerate(sorted_nodes)}
+        Solve DC operating point.
         
-        # Only map voltage sources (no inductors)
-        vsrc_start_idx = len(sorted_nodes)
-        self.vsrc_map = {}
-        for idx, src in enumerate(self.voltage_sources):
-            self.vsrc_map[src] = vsrc_start_idx + idx
+        Capacitors are open circuits and inductors are zero-volt sources.
+        Nodes without any DC path to ground (e.g. reached only through
+        capacitors) make the system singular; they are then tied to ground
+        by a DC_GMIN conductance, as in SPICE.
         
-        return len(sorted_nodes), len(self.voltage_sources)
-    
-    def solve_dc(self, debug=False):
-        """Solve DC operating point"""
-        # Build DC maps (without inductors)
-        n_nodes, n_vsrc = self._build_dc_maps()
+        Args:
+            debug (bool): If True, log debug information
+            precision (str): 'double', or 'mixed' to factor the matrix in
+                float32 and restore float64 accuracy by iterative refinement
+                (falls back to 'double' if refinement does not converge)
+            method (str): 'direct' for sparse LU, or 'gmres' for ILU
+                preconditioned GMRES, which needs less memory than a full
+                factorization on large netlists (falls back to 'direct' if
+                GMRES does not converge)
         
-        if n_nodes == 0:
-            return {}
+        Returns:
+            dict: 'V<node>' node voltages, 'I_<name>' currents of voltage
+                sources and inductors
+        """
+        if precision not in ('double', 'mixed'):
+            raise ValueError(f"Unknown precision '{precision}', "
+                             "expected 'double' or 'mixed'")
+        if method not in ('direct', 'gmres'):
+            raise ValueError(f"Unknown method '{method}', "
+                             "expected 'direct' or 'gmres'")
         
-        # Initialize MNA matrix
-        size = n_nodes + n_vsrc
-        matrix = np.zeros((size, size))
-        vector = np.zeros(size)
+        n_nodes, n_vsrc = self._build_maps()
         
-        # Let each element contribute to the matrix
-        for element in self.elements:
-            element.stamp(matrix, vector, self.node_map, self.vsrc_map)
+        if n_nodes == 0:
+            return {}
         
         if debug:
-            print("\nDC Analysis Debug Info:")
-            print("Node map:", self.node_map)
-            print("Vsrc map:", self.vsrc_map)
-            print("\nMNA Matrix:")
-            print(matrix)
-            print("\nRHS Vector:")
-            print(vector)
-            
-            # 打印子矩阵
-            if n_nodes > 0 and n_vsrc > 0:
-                print("\nSubmatrices:")
-                print("G (conductances):")
-                print(matrix[:n_nodes, :n_nodes])
-                print("\nB (voltage source connections):")
-                print(matrix[:n_nodes, n_nodes:])
-                print("\nC (transpose of B):")
-                print(matrix[n_nodes:, :n_nodes])
-                print("\nD (should be zero):")
-                print(matrix[n_nodes:, n_nodes:])
+            logger.debug("DC Analysis Debug Info:")
+        
+        # Assemble sparse MNA matrix
+        matrix, vector = self._build_mna_matrix(n_nodes, n_vsrc, debug)
         
         try:
-            solution = np.linalg.solve(matrix, vector)
+            try:
+                solution = self._solve_dc_system(matrix, vector, n_nodes,
+                                                 precision, method)
+            except RuntimeError:
+                logger.warning("DC system is singular, adding %g S from every "
+                               "node to ground", DC_GMIN)
+                gmin = np.zeros(matrix.shape[0])
+                gmin[:n_nodes] = DC_GMIN
+                # G is now only nonsingular by DC_GMIN: eliminating the
+                # source currents through it would lose accuracy
+                solution = self._solve_dc_system(matrix + diags(gmin), vector,
+                                                 n_nodes, precision, method,
+                                                 schur=False)
             
             # Extract results
             result = {}
@@ -215,17 +444,143 @@ class Circuit:
             for node, idx in self.node_map.items():
                 result[f"V{node}"] = solution[idx]
             
-            # Source currents
-            for src, idx in self.vsrc_map.items():
-                if isinstance(src, VoltageSource):
-                    result[f"I_{src.name}"] = solution[idx]
+            # Source and inductor currents
+            for src in self._by_type['V'] + self._by_type['L']:
+                result[f"I_{src.name}"] = solution[self.vsrc_map[src]]
             
             return result
             
-        except np.linalg.LinAlgError as e:
+        except (RuntimeError, np.linalg.LinAlgError) as e:
             raise ValueError(f"Failed to solve circuit: {str(e)}\n"
                            "The system might be singular or poorly conditioned.")
     
+    def capacitor_voltages(self, x):
+        """
+        Voltages of all capacitors from state vector(s) in one array operation.
+        
+        The terminal indices are cached per topology, so calling this for
+        every output point or trajectory costs one gather, not a dictionary
+        lookup per capacitor.
+        
+        Args:
+            x: State vector [v, iV, iL] or a trajectory of shape
+                (n_states, n_times), e.g. Solution.y from solve_dae
+        
+        Returns:
+            ndarray: Voltages entrance - exit, in capacitor insertion order
+        """
+        self._build_maps()
+        return terminal_voltages(self._by_type['C'], self.node_map, np.asarray(x))
+    
+    def inductor_currents(self, x):
+        """
+        Currents of all inductors from state vector(s).
+        
+        Args:
+            x: State vector [v, iV, iL] or a trajectory of shape
+                (n_states, n_times), e.g. Solution.y from solve_dae
+        
+        Returns:
+            ndarray: Inductor currents, in inductor insertion order
+        """
+        self._build_maps()
+        return np.asarray(x)[branch_indices(self._by_type['L'], self.vsrc_map)]
+    
+    def _solve_dc_system(self, matrix, vector, n_nodes, precision, method,
+                         schur=True):
+        """
+        Solve the assembled MNA system with the requested method and precision.
+        
+        schur=False factors the full matrix instead of eliminating the
+        source currents (see _factor_mna).
+        """
+        if method == 'gmres':
+            solution = _solve_gmres(matrix, vector)
+            if solution is not None:
+                return solution
+            logger.debug("GMRES did not converge, using sparse LU")
+        if precision == 'mixed':
+            solution = _solve_refined(matrix, vector)
+            if solution is not None:
+                return solution
+            logger.debug("Mixed-precision refinement did not converge, "
+                         "solving in float64")
+        return self._solve_mna(matrix, vector, n_nodes, schur)
+    
+    def _solve_mna(self, matrix, vector, n_nodes, schur=True):
+        """
+        Solve the MNA system, reusing the factorization of the last solve
+        when the matrix is unchanged (e.g. only source values changed).
+        
+        Args:
+            schur (bool): Eliminate the source currents (_factor_mna) or
+                factor the full matrix
+        
+        Raises:
+            RuntimeError: If the full matrix is exactly singular
+        """
+        cached = self._mna_solver
+        if cached is None or not _same_csr(cached[0], matrix):
+            solve = self._factor_mna(matrix, n_nodes) if schur else _factor(matrix).solve
+            cached = self._mna_solver = (matrix, solve)
+        return cached[1](vector)
+    
+    def _factor_mna(self, matrix, n_nodes):
+        """
+        Factor the MNA system for block elimination of the source currents.
+        
+        [G B] [v] = [i]
+        [C D] [j]   [e]
+        
+        G is factored once with sparse LU, the source currents follow from
+        the small m x m Schur complement S = D - C G^-1 B:
+            S j = e - C G^-1 i,   v = G^-1 (i - B j)
+        This costs one sparse factorization of G plus O(m^3) instead of a
+        factorization of the full (n+m) x (n+m) matrix. Both factorizations
+        are kept, so each right-hand side costs only triangular solves.
+        
+        Falls back to LU of the full matrix when there are many sources or
+        G is (nearly) singular, e.g. for nodes that are only held by
+        voltage sources.
+        
+        Returns:
+            callable: vector -> solution
+        
+        Raises:
+            RuntimeError: If the full matrix is exactly singular
+            LinAlgError: If the Schur complement is singular
+        """
+        n_vsrc = matrix.shape[0] - n_nodes
+        if n_vsrc > SCHUR_MAX_SOURCES:
+            return _factor(matrix).solve
+        
+        try:
+            lu = _factor(matrix[:n_nodes, :n_nodes])
+        except RuntimeError:
+            return _factor(matrix).solve
+        
+        # Tiny pivots mean G is singular up to rounding
+        pivots = np.abs(lu.U.diagonal())
+        if pivots.min() < SCHUR_PIVOT_RATIO * pivots.max():
+            return _factor(matrix).solve
+        
+        if n_vsrc == 0:
+            return lu.solve
+        
+        B = matrix[:n_nodes, n_nodes:].toarray()
+        C = matrix[n_nodes:, :n_nodes]
+        D = matrix[n_nodes:, n_nodes:].toarray()
+        X = lu.solve(B)  # G^-1 B
+        schur = lu_factor(D - C @ X)
+        if not np.all(np.diag(schur[0])):
+            raise np.linalg.LinAlgError("Singular matrix")
+        
+        def solve(vector):
+            w = lu.solve(vector[:n_nodes])
+            j = lu_solve(schur, vector[n_nodes:] - C @ w)
+            return np.concatenate([w - X @ j, j])
+        return solve
+    
     def validate_circuit(self):
         """
         Validate the circuit configuration.
@@ -233,50 +588,57 @@ class Circuit:
         Returns:
             bool: True if circuit is valid, False otherwise
         """
-        # check node connections
-        node_connections = defaultdict(int)
-        for element in self.elements:
-            node_connections[element.entrance] += 1
-            node_connections[element.exit] += 1
-        
-        # check floating nodes
-        for node, count in node_connections.items():
-            if count < 2 and node != 0:  # ground node can have only one connection
-                print(f"Warning: Node {node} might be floating (only {count} connection)")
-                return False
+        # count node connections
+        terminals = [node for e in self.elements for node in (e.entrance, e.exit)]
+        array = np.asarray(terminals)
+        
+        # check floating nodes (ground node can have only one connection)
+        if array.dtype.kind in 'iu':
+            nodes, counts = np.unique(array, return_counts=True)
+            floating = nodes[(counts == 1) & (nodes != 0)].tolist()
+        else:
+            floating = [node for node, count in Counter(terminals).items()
+                        if count == 1 and node != 0]
+        for node in floating:
+            logger.warning("Node %s might be floating (only 1 connection)", node)
             
-        return True
+        return not floating
     
     def _get_consistent_initial_conditions(self, A, B, C):
         """
         Calculate consistent initial condiitons for DAE system
         For DAE system A * y' + B * y + C = 0
         Using algvar_list to calculate initial conditions
-        - solve y0: (A * algvar_list + B)* y0 + C = 0
+        - differential variables start at zero
+        - algebraic variables solve their rows of B * y0 + C = 0
         """
 
         n_nodes, n_currents = self._build_maps()
         size = n_nodes + n_currents
-
-        # Initialize matrices
-        y0 = np.zeros(size)
+        
         yd0 = np.zeros(size)
+        algvar = np.asarray(self._algvar_list, dtype=bool)
+        diff = np.flatnonzero(algvar)
         
         # Build system matrix for algebraic variables
-        # M * y0 = -C, where M = B for algebraic rows
-        M = B.copy()
+        # M * y0 = -C, where M = B for algebraic rows; rows of differential
+        # variables are dropped from B's triplets and replaced by identity rows
+        B = B.tocoo()
+        keep = ~algvar[B.row]
+        M = coo_matrix((np.concatenate([B.data[keep], np.ones(diff.size)]),
+                        (np.concatenate([B.row[keep], diff]),
+                         np.concatenate([B.col[keep], diff]))),
+                       shape=(size, size))
         
-        # Zero out rows corresponding to differential variables
-        for i in range(size):
-             if self._algvar_list[i] == 1:
-                M[i,:] = 0
-                M[i,i] = 1
+        # Differential variables (capacitor voltages, inductor currents) start at zero
+        rhs = -C
+        rhs[algvar] = 0.0
         
-        y0 = np.linalg.solve(M, -C)
+        y0 = _factor(M).solve(rhs)
         
         return y0, yd0
     
-    def build_dae_system(self):
+    def build_dae_system(self, dtype=np.float64):
         """
         Build DAE system matrices: A * dx/dt = B * x + C
         
@@ -286,65 +648,96 @@ class Circuit:
         - iV1 to iVm: voltage source currents
         - iL1 to iLk: inductor currents
         
+        Args:
+            dtype: Storage type of A, B and C, e.g. np.float32 to halve the
+                memory traffic of the residual; the initial conditions are
+                always computed and returned in float64
+        
         Returns:
-            tuple: (A, B, C) matrices and initial conditions (y0, yd0)
+            tuple: (A, B, C) matrices (A, B as scipy.sparse CSR) and
+                initial conditions (y0, yd0)
         """
-        # Build node and current mappings
+        # Build node and current mappings and the variable type list
         n_nodes, n_currents = self._build_maps()
+        self._update_algvar_list()
         
         # Total size of the system
         size = n_nodes + n_currents
         
-        # Initialize matrices
-        A = np.zeros((size, size))  # Derivative term coefficient matrix
-        B = np.zeros((size, size))  # State variable coefficient matrix
-        C = np.zeros(size)          # Constant term vector
+        # Collect stamps as sparse triplets
+        A = TripletMatrix(size)  # Derivative term coefficient matrix
+        B = TripletMatrix(size)  # State variable coefficient matrix
+        C = np.zeros(size)       # Constant term vector
         
-        # Let each element contribute to the matrices
-        for element in self.elements:
-            element.stamp_dae(A, B, C, self.node_map, self.vsrc_map)
+        # Let each group of elements contribute to the matrices
+        self._stamp_groups('stamp_dae_many', A, B, C)
+        
+        A = self._assemble('A', A)
+        B = self._assemble('B', B)
         
         # Use consistent initial conditions
         y0, yd0 = self._get_consistent_initial_conditions(A, B, C)
         
+        if dtype != np.float64:
+            A, B, C = A.astype(dtype), B.astype(dtype), C.astype(dtype)
+        
         return A, B, C, y0, yd0, self._algvar_list
     
-    def solve_dae(self, t_span, debug=False):
+    def solve_dae(self, t_span, debug=False, precision='double', method='auto'):
         """
         Solve circuit DAE system for transient analysis.
         
         Args:
             t_span: tuple (t0, tf) for time range
-            debug: bool, if True print debug information
+            debug: bool, if True log debug information
+            precision: 'double' or 'single'; single stores A, B, C in float32
+                for the residual and Jacobian while IDA's state stays float64.
+                Only suitable when the solver tolerances are well above 1e-7
+                relative to the state magnitudes. Requires method='ida'.
+            method: 'auto', 'expm' or 'ida'. The circuit equations are linear
+                with constant coefficients, so 'expm' propagates the exact
+                solution with a matrix exponential (see linear_dae); 'auto'
+                uses it when possible and falls back to IDA for large or
+                higher-index systems.
             
         Returns:
             Solution object from DAESolver
         """
-        # Build DAE system
-        A, B, C, y0, yd0, algvar_list = self.build_dae_system()
+        if method not in ('auto', 'expm', 'ida'):
+            raise ValueError(f"Unknown method '{method}', "
+                             "expected 'auto', 'expm' or 'ida'")
+        dtypes = {'double': np.float64, 'single': np.float32}
+        if precision not in dtypes:
+            raise ValueError(f"Unknown precision '{precision}', "
+                             f"expected one of {sorted(dtypes)}")
+        if precision == 'single' and method != 'ida':
+            raise ValueError("precision='single' only applies to the IDA "
+                             "residual, use method='ida'")
         
-        if debug:
-            print("\nDAE System:")
-            print("A matrix:")
-            print(A)
-            print("\nB matrix:")
-            print(B)
-            print("\nC vector:")
-            print(C)
-            print("\nInitial conditions:")
-            print("y0:", y0)
-            print("yd0:", yd0)
-            print("algvar:", algvar_list)
-        
-        # Create solver with algvar configuration
-        from .dae_solver import DAESolver
+        # Build DAE system
+        A, B, C, y0, yd0, algvar_list = self.build_dae_system(dtypes[precision])
+        
+        if debug and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("DAE System:\nA matrix:\n%s\nB matrix:\n%s\nC vector:\n%s",
+                         A.toarray(), B.toarray(), C)
+            logger.debug("Initial conditions:\ny0: %s\nyd0: %s\nalgvar: %s",
+                         y0, yd0, algvar_list)
+        
+        if method != 'ida':
+            from .linear_dae import solve_linear_dae
+            result = solve_linear_dae(A, B, C, y0, t_span, DEFAULT_NCP)
+            if result is not None:
+                return Solution(*result)
+            if method == 'expm':
+                raise ValueError("Matrix exponential solution requires an index-1 "
+                                 "system of moderate size")
+            logger.debug("Linear DAE fast path not applicable, using IDA")
+        
+        # Create solver with algvar configuration; only IDA needs Assimulo
+        from .dae_solver import DAESolver, _LinearDAEResidual
         solver = DAESolver({
             'algvar': algvar_list
         })
-        
-        def residual(t, y, yd):
-            """DAE system residual function"""
-            return A @ yd + B @ y + C
-        
-        return solver.solve(residual, t_span, y0, yd0)
-    
\ No newline at end of file
+        residual = _LinearDAEResidual(A, B, C)
+        jac_fn = residual.jacobian if residual.dense else None
+        return solver.solve(residual, t_span, y0, yd0, jac_fn=jac_fn)
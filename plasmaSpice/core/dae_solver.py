@@ -1,6 +1,14 @@
+import logging
 from assimulo.problem import Implicit_Problem
 from assimulo.solvers import IDA
 import numpy as np
+from scipy.sparse import hstack
+from .solution import DEFAULT_NCP, Solution
+
+logger = logging.getLogger(__name__)
+
+# Largest DAE system whose residual is evaluated with dense matrices
+DENSE_RESIDUAL_MAX_SIZE = 200
 
 class DAESolver:
     """DAE solver using Assimulo's IDA interface"""
@@ -17,7 +25,7 @@ class DAESolver:
                 - inith: Initial step size (default: 1e-14)
                 - verbosity: Output level (default: 50)
                 - suppress_alg: Suppress algebraic variable warnings (default: True)
-                - ncp: Number of communication points (default: 10000)
+                - ncp: Number of communication points (default: DEFAULT_NCP)
         """
         self.options = {
             'atol': 1e-6,
@@ -26,7 +34,7 @@ class DAESolver:
             'inith': 1e-14,
             'verbosity': 50,
             'suppress_alg': True,
-            'ncp': 10000
+            'ncp': DEFAULT_NCP
         }
         
         # Update with user provided options
@@ -42,7 +50,7 @@ class DAESolver:
         """
         self.options.update(kwargs)
     
-    def solve(self, residual_fn, t_span, y0, yd0, t_eval=None):
+    def solve(self, residual_fn, t_span, y0, yd0, t_eval=None, jac_fn=None):
         """
         Solve DAE system: F(t, y, y') = 0
         
@@ -52,15 +60,21 @@ class DAESolver:
             y0: Initial state vector
             yd0: Initial state derivative vector
             t_eval: Optional time points for output
+            jac_fn: Optional analytic Jacobian jac_fn(c, t, y, yd) returning
+                dF/dy + c * dF/dy'; without it IDA uses finite differences
             
         Returns:
             Solution object containing results
         """
         # Create problem
         problem = Implicit_Problem(residual_fn, y0, yd0, t0=t_span[0])
+        if jac_fn is not None:
+            problem.jac = jac_fn
         
         # Create solver
         solver = IDA(problem)
+        if jac_fn is not None:
+            solver.usejac = True
         
         # Configure solver with current options
         for key, value in self.options.items():
@@ -70,7 +84,7 @@ class DAESolver:
         # Set algebraic variables
         if 'algvar' in self.options:
             solver.algvar = self.options['algvar']
-            print("Setting algvar:", self.options['algvar'])
+            logger.debug("Setting algvar: %s", self.options['algvar'])
         
         # Solve system
         if t_eval is not None:
@@ -80,10 +94,71 @@ class DAESolver:
         
         return Solution(solution[0], solution[1].T)
 
-class Solution:
-    """Solution returned by DAE solver"""
-    def __init__(self, t, y):
-        self.t = np.array(t)
-        self.y = np.array(y)
-        self.success = True
-        self.message = "Integration successful."
\ No newline at end of file
+class _LinearDAEResidual:
+    """
+    Residual and Jacobian of the linear DAE system A * y' + B * y + C = 0.
+    
+    The residual is one matvec of K = [A B C] with the stacking buffer
+    z = [yd; y; 1]; yd and y are copied into precomputed views of z and
+    the result is written into a preallocated output. Systems up to
+    DENSE_RESIDUAL_MAX_SIZE keep K dense, where an in-place np.dot beats
+    sparse matvec dispatch.
+    
+    The matrices may be float32: the product is then formed in single
+    precision and copied into the float64 output that IDA requires.
+    
+    The analytic Jacobian is only offered in the dense regime: IDA's dense
+    linear solver needs an n x n array, which large systems should not
+    allocate, so they keep IDA's own finite-difference Jacobian.
+    """
+    
+    __slots__ = ('K', 'z', 'yd_part', 'y_part', 'prod', 'out', 'dense',
+                 'A_dense', 'B_dense', 'J')
+    
+    def __init__(self, A, B, C):
+        """
+        Args:
+            A, B: scipy.sparse matrices of the DAE system
+            C: Constant term vector (same dtype as A and B)
+        """
+        size = len(C)
+        K = hstack([A, B, C[:, None]], format='csr')
+        self.dense = size <= DENSE_RESIDUAL_MAX_SIZE
+        self.K = K.toarray() if self.dense else K
+        self.z = np.empty(2 * size + 1, dtype=K.dtype)
+        self.z[-1] = 1.0
+        self.yd_part = self.z[:size]
+        self.y_part = self.z[size:2 * size]
+        self.out = np.empty(size)
+        self.prod = self.out if K.dtype == self.out.dtype else np.empty(size, dtype=K.dtype)
+        if self.dense:
+            # The Jacobian blocks are views into the dense K
+            self.A_dense = self.K[:, :size]
+            self.B_dense = self.K[:, size:2 * size]
+            self.J = np.empty((size, size))
+        else:
+            self.A_dense = self.B_dense = self.J = None
+    
+    def __call__(self, t, y, yd):
+        """DAE system residual function"""
+        self.yd_part[...] = yd
+        self.y_part[...] = y
+        if not self.dense:
+            self.out[...] = self.K @ self.z
+        elif self.prod is self.out:
+            np.dot(self.K, self.z, out=self.out)
+        else:
+            np.dot(self.K, self.z, out=self.prod)
+            self.out[...] = self.prod
+        return self.out
+    
+    def jacobian(self, c, t, y, yd):
+        """
+        Analytic Jacobian dF/dy + c * dF/dyd = c * A + B (exact, F is linear)
+        
+        Only used for systems in the dense regime (see the class docstring).
+        """
+        J = self.J
+        np.multiply(self.A_dense, c, out=J)
+        np.add(J, self.B_dense, out=J)
+        return J
@@ -9,7 +9,7 @@ Each element contributes to different parts of the MNA matrix:
 where:
 - G (n * n): Conductance matrix for passive elements
 - B (n * m): Voltage source connections
-- C (m * n): Typically B^T for independent sources
+- C (m * n): -B^T for voltage sources, B^T for inductors
 - D (m * m): Zero for independent sources
 - v: Node voltage vector
 - j: Source current vector
@@ -28,11 +28,27 @@ Index mapping:
 - vsrc_map: maps voltage sources and inductors to current indices [n, n+m+k-1]
   - Voltage source currents: [n, n+m-1]
   - Inductor currents: [n+m, n+m+k-1]
+
+Matrices passed to the stamp methods are sparse triplet accumulators
+(see assembly.TripletMatrix): contributions are added with
+matrix.add(row, col, value) and duplicate entries are summed on assembly.
+RHS vectors (vector, C) are dense NumPy arrays.
+
+The circuit stamps all elements of one type together through the
+stamp_many / stamp_dae_many class methods. The base implementations loop
+over the per-element stamps; built-in elements override them with
+vectorized versions that produce the same entries.
 """
 
+from .assembly import (node_indices, branch_indices, values, conductance_pattern,
+                       stamp_conductance, stamp_incidence, stamp_injection)
+
 class Component:
     """Base class for all circuit elements."""
     
+    kind = None  # Bucket key used by Circuit ('R', 'V', 'I', 'C', 'L')
+    __slots__ = ('name', 'entrance', 'exit')
+    
     def __init__(self, name, entrance, exit):
         """
         Initialize a circuit element.
@@ -53,11 +69,65 @@ class Component:
     def stamp_dae(self, A, B, C, node_map, vsrc_map):
         """DAE Analysis"""
         raise NotImplementedError
+    
+    def _stamp_conductance(self, matrix, node_map, g):
+        """Stamp the two-terminal pattern [[g, -g], [-g, g]]."""
+        add = matrix.add
+        if self.entrance != 0 and self.exit != 0:
+            i = node_map[self.entrance]
+            j = node_map[self.exit]
+            add(i, i, g)
+            add(j, j, g)
+            add(i, j, -g)
+            add(j, i, -g)
+        elif self.entrance != 0:
+            i = node_map[self.entrance]
+            add(i, i, g)
+        elif self.exit != 0:
+            j = node_map[self.exit]
+            add(j, j, g)
+    
+    def _stamp_incidence(self, matrix, node_map, k, row_sign, col_sign):
+        """
+        Stamp the branch-current incidence of branch k: row_sign at
+        (k, entrance) and col_sign at (entrance, k), negated for the exit.
+        """
+        add = matrix.add
+        if self.entrance != 0 and self.exit != 0:
+            i = node_map[self.entrance]
+            j = node_map[self.exit]
+            add(k, i, row_sign)
+            add(i, k, col_sign)
+            add(k, j, -row_sign)
+            add(j, k, -col_sign)
+        elif self.entrance != 0:
+            i = node_map[self.entrance]
+            add(k, i, row_sign)
+            add(i, k, col_sign)
+        elif self.exit != 0:
+            j = node_map[self.exit]
+            add(k, j, -row_sign)
+            add(j, k, -col_sign)
+    
+    @classmethod
+    def stamp_many(cls, elements, matrix, vector, node_map, vsrc_map):
+        """DC Analysis for a group of elements of this type"""
+        for element in elements:
+            element.stamp(matrix, vector, node_map, vsrc_map)
+    
+    @classmethod
+    def stamp_dae_many(cls, elements, A, B, C, node_map, vsrc_map):
+        """DAE Analysis for a group of elements of this type"""
+        for element in elements:
+            element.stamp_dae(A, B, C, node_map, vsrc_map)
 
 
 class Resistor(Component):
     """Resistor element for circuit simulation."""
     
+    kind = 'R'
+    __slots__ = ('conductance',)
+    
     def __init__(self, name, entrance, exit, resistance):
         """
         Initialize a resistor.
@@ -66,7 +136,28 @@ class Resistor(Component):
             resistance (float): Resistance value in ohms
         """
         super().__init__(name, entrance, exit)
-        self.resistance = resistance
+        self.conductance = 1.0 / resistance
+    
+    @classmethod
+    def from_conductance(cls, name, entrance, exit, conductance):
+        """
+        Create a resistor from its conductance, without a division.
+        
+        Args:
+            conductance (float): Conductance value in siemens
+        """
+        resistor = cls.__new__(cls)
+        Component.__init__(resistor, name, entrance, exit)
+        resistor.conductance = conductance
+        return resistor
+    
+    @property
+    def resistance(self):
+        """Resistance in ohms; the conductance is the stored value."""
+        return 1.0 / self.conductance
+    
+    @resistance.setter
+    def resistance(self, resistance):
         self.conductance = 1.0 / resistance
     
     def stamp(self, matrix, vector, node_map, vsrc_map):
@@ -81,37 +172,31 @@ class Resistor(Component):
         and does not contribute to B, C, or D submatrices.
         """
         # Only stamp in the G submatrix (upper-left block)
-        if self.entrance != 0:  # entrance is not ground
-            i = node_map[self.entrance]
-            matrix[i, i] += self.conductance
-            if self.exit != 0:
-                j = node_map[self.exit]
-                matrix[i, j] -= self.conductance
-                matrix[j, i] -= self.conductance
-        
-        if self.exit != 0:  # exit is not ground
-            j = node_map[self.exit]
-            matrix[j, j] += self.conductance
+        self._stamp_conductance(matrix, node_map, self.conductance)
     
     def stamp_dae(self, A, B, C, node_map, vsrc_map):
         """Resistor contribution to DAE system."""
-        
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            B[i,i] += self.conductance
-            if self.exit != 0:
-                j = node_map[self.exit]
-                B[i,j] -= self.conductance
-                B[j,i] -= self.conductance
-        
-        if self.exit != 0:
-            j = node_map[self.exit]
-            B[j,j] += self.conductance
+        self._stamp_conductance(B, node_map, self.conductance)
+    
+    @classmethod
+    def stamp_many(cls, resistors, matrix, vector, node_map, vsrc_map):
+        """Vectorized G submatrix stamp for a group of resistors."""
+        stamp_conductance(matrix, conductance_pattern(resistors, node_map),
+                          values(resistors, 'conductance'))
+    
+    @classmethod
+    def stamp_dae_many(cls, resistors, A, B, C, node_map, vsrc_map):
+        """Vectorized DAE stamp for a group of resistors."""
+        stamp_conductance(B, conductance_pattern(resistors, node_map),
+                          values(resistors, 'conductance'))
 
 
 class VoltageSource(Component):
     """Independent voltage source element."""
     
+    kind = 'V'
+    __slots__ = ('voltage',)
+    
     def __init__(self, name, entrance, exit, voltage):
         """
         Initialize a voltage source.
@@ -128,29 +213,24 @@ class VoltageSource(Component):
         Add voltage source contributions to the MNA matrix.
         
         For a voltage source between nodes i and j:
-        1. In B matrix (and C = B^T):
-           - Add +1 to B[i,k] and -1 to B[j,k]
+        1. In B matrix (and C = -B^T):
+           - Add -1 to B[i,k] and +1 to B[j,k]
            where k is the index of this voltage source
         2. In RHS vector:
            - Add voltage value to e[k]
         
         The voltage source contributes to:
         - B submatrix: Relates node voltages to source currents
-        - C submatrix: Relates source currents to node voltages (C = B^T)
+        - C submatrix: Relates source currents to node voltages (C = -B^T)
         - e vector: Contains the voltage source value
+        
+        The source current j[k] flows out of the entrance node into the
+        circuit, so it is positive when the source delivers power; this is
+        the same convention as the DAE state.
         """
         # Get the index for this voltage source in the extended part of the matrix
         k = vsrc_map[self]
-        
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            matrix[i, k] += 1.0
-            matrix[k, i] += 1.0
-        
-        if self.exit != 0:
-            j = node_map[self.exit]
-            matrix[j, k] -= 1.0
-            matrix[k, j] -= 1.0
+        self._stamp_incidence(matrix, node_map, k, 1.0, -1.0)
         
         # Add voltage to RHS vector (e part)
         vector[k] = self.voltage
@@ -158,23 +238,28 @@ class VoltageSource(Component):
     def stamp_dae(self, A, B, C, node_map, vsrc_map):
         """Voltage source contribution to DAE system."""
         i_idx = vsrc_map[self]
-        
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            B[i_idx, i] = 1.0
-            B[i, i_idx] = -1.0
-        
-        if self.exit != 0:
-            j = node_map[self.exit]
-            B[i_idx, j] = -1.0
-            B[j, i_idx] = 1.0
-        
+        self._stamp_incidence(B, node_map, i_idx, 1.0, -1.0)
         C[i_idx] = -self.voltage
+    
+    @classmethod
+    def stamp_many(cls, sources, matrix, vector, node_map, vsrc_map):
+        """Vectorized MNA stamp for a group of voltage sources."""
+        stamp_incidence(matrix, sources, node_map, vsrc_map, 1.0, -1.0)
+        vector[branch_indices(sources, vsrc_map)] = values(sources, 'voltage')
+    
+    @classmethod
+    def stamp_dae_many(cls, sources, A, B, C, node_map, vsrc_map):
+        """Vectorized DAE stamp for a group of voltage sources."""
+        stamp_incidence(B, sources, node_map, vsrc_map, 1.0, -1.0)
+        C[branch_indices(sources, vsrc_map)] = -values(sources, 'voltage')
 
 
 class CurrentSource(Component):
     """Independent current source element."""
     
+    kind = 'I'
+    __slots__ = ('current',)
+    
     def __init__(self, name, entrance, exit, current):
         """
         Initialize a current source.
@@ -224,11 +309,26 @@ class CurrentSource(Component):
         if self.exit != 0:
             j = node_map[self.exit]
             C[j] += self.current
+    
+    @classmethod
+    def stamp_many(cls, sources, matrix, vector, node_map, vsrc_map):
+        """Vectorized RHS stamp for a group of current sources."""
+        entrance, exit = node_indices(sources, node_map)
+        stamp_injection(vector, entrance, exit, values(sources, 'current'))
+    
+    @classmethod
+    def stamp_dae_many(cls, sources, A, B, C, node_map, vsrc_map):
+        """Vectorized C vector stamp for a group of current sources."""
+        entrance, exit = node_indices(sources, node_map)
+        stamp_injection(C, entrance, exit, values(sources, 'current'))
 
 
 class Capacitor(Component):
     """Capacitor element for circuit simulation."""
     
+    kind = 'C'
+    __slots__ = ('capacitance',)
+    
     def __init__(self, name, entrance, exit, capacitance):
         """
         Initialize a capacitor.
@@ -241,42 +341,45 @@ class Capacitor(Component):
         self.capacitance = capacitance
     
     def stamp(self, matrix, vector, node_map, vsrc_map):
-        """DC Analysis: Capacitor as large resistance."""
-        r = 1e9  # 1GΩ
-        
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            matrix[i, i] += 1/r
-            if self.exit != 0:
-                j = node_map[self.exit]
-                matrix[i, j] -= 1/r
-                matrix[j, i] -= 1/r
-                matrix[j, j] += 1/r
-        elif self.exit != 0:
-            j = node_map[self.exit]
-            matrix[j, j] += 1/r
+        """DC Analysis: Capacitor is an open circuit, no contribution."""
     
     def stamp_dae(self, A, B, C, node_map, vsrc_map):
         """
         Capacitor only contribute for the A matrix
         i = C * d(vi - vj)/dt
         """
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            A[i,i] += self.capacitance
-            if self.exit != 0:
-                j = node_map[self.exit]
-                A[i,j] -= self.capacitance
-                A[j,i] -= self.capacitance
+        self._stamp_conductance(A, node_map, self.capacitance)
+    
+    @classmethod
+    def stamp_many(cls, capacitors, matrix, vector, node_map, vsrc_map):
+        """DC Analysis: capacitors are open circuits, no contribution."""
+    
+    @classmethod
+    def stamp_dae_many(cls, capacitors, A, B, C, node_map, vsrc_map):
+        """Vectorized A matrix stamp for a group of capacitors."""
+        stamp_conductance(A, conductance_pattern(capacitors, node_map),
+                          values(capacitors, 'capacitance'))
+    
+    def get_voltage(self, result):
+        """
+        Voltage across the capacitor (entrance - exit).
         
-        if self.exit != 0:
-            j = node_map[self.exit]
-            A[j,j] += self.capacitance
+        Args:
+            result (dict): Node voltages 'V<node>' as returned by solve_dc;
+                ground is 0 V
+        
+        Returns:
+            float: Capacitor voltage
+        """
+        return result.get(f"V{self.entrance}", 0.0) - result.get(f"V{self.exit}", 0.0)
 
 
 class Inductor(Component):
     """Inductor element for circuit simulation."""
     
+    kind = 'L'
+    __slots__ = ('inductance',)
+    
     def __init__(self, name, entrance, exit, inductance):
         """
         Initialize an inductor.
@@ -291,36 +394,39 @@ class Inductor(Component):
     def stamp(self, matrix, vector, node_map, vsrc_map):
         """
         Add inductor contributions to the MNA matrix.
-        For DC analysis, inductor is treated as a short circuit.
+        For DC analysis, inductor is a short circuit: a zero-volt source
+        whose current is the inductor current (same index and sign as in
+        the DAE system), v_i - v_j = 0.
         """
-        # In DC analysis, inductor is a short circuit
-        # Use a very small resistance to approximate short circuit
-        r = 1e-6  # 1 μΩ
-        
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            matrix[i, i] += 1/r
-            if self.exit != 0:
-                j = node_map[self.exit]
-                matrix[i, j] -= 1/r
-                matrix[j, i] -= 1/r
-                matrix[j, j] += 1/r
-        elif self.exit != 0:
-            j = node_map[self.exit]
-            matrix[j, j] += 1/r
+        self._stamp_incidence(matrix, node_map, vsrc_map[self], 1.0, 1.0)
     
     def stamp_dae(self, A, B, C, node_map, vsrc_map):
         """Inductor contribution to DAE system."""
         iL_idx = vsrc_map[self]
         
-        A[iL_idx, iL_idx] = -self.inductance
+        A.add(iL_idx, iL_idx, -self.inductance)
+        self._stamp_incidence(B, node_map, iL_idx, 1.0, 1.0)
+    
+    @classmethod
+    def stamp_many(cls, inductors, matrix, vector, node_map, vsrc_map):
+        """Vectorized DC stamp for a group of inductors (zero-volt sources)."""
+        stamp_incidence(matrix, inductors, node_map, vsrc_map, 1.0, 1.0)
+    
+    @classmethod
+    def stamp_dae_many(cls, inductors, A, B, C, node_map, vsrc_map):
+        """Vectorized DAE stamp for a group of inductors."""
+        k = branch_indices(inductors, vsrc_map)
+        A.extend(k, k, -values(inductors, 'inductance'))
+        stamp_incidence(B, inductors, node_map, vsrc_map, 1.0, 1.0)
+    
+    def get_current(self, result):
+        """
+        Inductor current, entrance to exit, from a solve_dc result.
         
-        if self.entrance != 0:
-            i = node_map[self.entrance]
-            B[iL_idx, i] = 1.0
-            B[i, iL_idx] = 1.0
+        Args:
+            result (dict): Result with 'I_<name>' currents, as returned by solve_dc
         
-        if self.exit != 0:
-            j = node_map[self.exit]
-            B[iL_idx, j] = -1.0
-            B[j, iL_idx] = -1.0
\ No newline at end of file
+        Returns:
+            float: Inductor current
+        """
+        return result[f"I_{self.name}"]
@@ -0,0 +1,125 @@
+"""
+Closed-form transient solution of the linear DAE system A * y' + B * y + C = 0.
+
+All circuit elements are linear with constant coefficients, so instead of
+running Newton/BDF steps the system is reduced to an ODE and propagated
+with a matrix exponential:
+
+1. The differential subspace is taken from the structure of A: only the
+   rows/columns where A has entries (capacitor nodes, inductor currents)
+   can be differential. That block is equilibrated by its diagonal,
+   D * A_s * D with D = |diag(A_s)|^-1/2, so capacitances and inductances
+   of very different magnitude are compared on the same scale, and its
+   SVD U * S * V^T splits y = T * x into differential components x1 and
+   algebraic components x2 (a singular-value test relative to the largest
+   one, e.g. for a capacitor loop).
+2. For an index-1 system the algebraic rows W (B * y + C) = 0 give
+   x2 = -B22^-1 (B21 * x1 + c2), leaving x1' = M * x1 + f.
+3. On a uniform time grid with step h, [x1; 1] advances by one product
+   with E = expm([[M, f], [0, 0]] * h) per step.
+
+Systems that are too large for dense factorizations, or that are not
+index-1 (singular B22, e.g. a loop of capacitors and voltage sources),
+are left to the IDA solver.
+"""
+
+import numpy as np
+from scipy.linalg import expm, lu_factor, lu_solve, svd
+
+# Largest system solved with dense SVD / expm
+LINEAR_EXPM_MAX_SIZE = 500
+# Singular values of the equilibrated A block, relative to the largest,
+# treated as zero
+RANK_TOL = 1e-10
+# Reciprocal condition number of B22 below which the system is not index-1
+INDEX1_RCOND = 1e-12
+
+
+def solve_linear_dae(A, B, C, y0, t_span, ncp):
+    """
+    Solve A * y' + B * y + C = 0 on ncp + 1 uniformly spaced time points.
+
+    Args:
+        A, B: System matrices (dense or scipy.sparse)
+        C: Constant term vector
+        y0: Initial state; only its differential components are used, the
+            algebraic components follow from the constraints
+        t_span: tuple (t0, tf) for time range
+        ncp: Number of communication points (steps)
+
+    Returns:
+        tuple: (t, y) with y of shape (n_states, ncp + 1), or None if the
+            system is too large or not index-1
+    """
+    size = len(C)
+    if size == 0 or size > LINEAR_EXPM_MAX_SIZE:
+        return None
+
+    A = np.asarray(A.toarray() if hasattr(A, 'toarray') else A, dtype=float)
+    B = np.asarray(B.toarray() if hasattr(B, 'toarray') else B, dtype=float)
+    C = np.asarray(C, dtype=float)
+
+    # Structural differential candidates and their equilibrated block
+    active = np.flatnonzero(np.any(A != 0, axis=0) | np.any(A != 0, axis=1))
+    block = A[np.ix_(active, active)]
+    diag = np.abs(np.diag(block))
+    if active.size:
+        magnitude = np.maximum(np.abs(block).max(axis=0), np.abs(block).max(axis=1))
+        d = 1.0 / np.sqrt(np.where(diag > 0, diag, magnitude))
+        U, s, Vt = svd(d[:, None] * block * d)
+        rank = int(np.count_nonzero(s > RANK_TOL * s[0]))
+    else:
+        d, s = np.zeros(0), np.zeros(0)
+        U = Vt = np.zeros((0, 0))
+        rank = 0
+    
+    # W * A * T = diag(s) on the first rank components; the remaining block
+    # components and all other variables are algebraic
+    rest = np.setdiff1d(np.arange(size), active)
+    T = np.zeros((size, size))
+    T[np.ix_(active, np.arange(active.size))] = d[:, None] * Vt.T
+    T[rest, active.size + np.arange(rest.size)] = 1.0
+    W = np.zeros((size, size))
+    W[np.ix_(np.arange(active.size), active)] = U.T * d
+    W[active.size + np.arange(rest.size), rest] = 1.0
+    
+    # Rotate into differential (1) and algebraic (2) coordinates
+    Bt = W @ B @ T
+    c = W @ C
+    B11, B12 = Bt[:rank, :rank], Bt[:rank, rank:]
+    B21, B22 = Bt[rank:, :rank], Bt[rank:, rank:]
+    
+    # Eliminate the algebraic components: x2 = P * x1 + q
+    if rank < size:
+        if 1.0 / np.linalg.cond(B22) < INDEX1_RCOND:
+            return None
+        lu = lu_factor(B22)
+        P = -lu_solve(lu, B21)
+        q = -lu_solve(lu, c[rank:])
+    else:
+        P = np.zeros((0, rank))
+        q = np.zeros(0)
+    
+    # x1' = M * x1 + f, embedded as a homogeneous system in [x1; 1]
+    inv_s = 1.0 / s[:rank]
+    aug = np.zeros((rank + 1, rank + 1))
+    aug[:rank, :rank] = -inv_s[:, None] * (B11 + B12 @ P)
+    aug[:rank, rank] = -inv_s * (c[:rank] + B12 @ q)
+
+    t0, tf = t_span
+    t = np.linspace(t0, tf, ncp + 1)
+    E = expm(aug * (t[1] - t0)) if ncp > 0 else np.eye(rank + 1)
+
+    z = np.empty((ncp + 1, rank + 1))
+    z[0, :rank] = Vt[:rank] @ (np.asarray(y0, dtype=float)[active] / d)
+    z[0, rank] = 1.0
+    Et = E.T
+    for k in range(ncp):
+        np.dot(z[k], Et, out=z[k + 1])
+
+    # Back to the original variables: y = T1 * x1 + T2 * (P * x1 + q)
+    x1 = z[:, :rank].T
+    y = T[:, :rank] @ x1
+    if rank < size:
+        y += T[:, rank:] @ (P @ x1 + q[:, None])
+    return t, y
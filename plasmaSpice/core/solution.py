@@ -0,0 +1,19 @@
+"""
+Transient solution container shared by the IDA and matrix exponential
+solvers; kept free of the Assimulo import so the latter runs without it.
+"""
+
+import numpy as np
+
+# Number of communication points (output intervals) when no t_eval is given
+DEFAULT_NCP = 10000
+
+class Solution:
+    """Solution returned by DAE solver"""
+    def __init__(self, t, y):
+        # asarray: no copy of the trajectory; y may be a transposed view
+        # of the solver output, shape (n_states, n_times)
+        self.t = np.asarray(t)
+        self.y = np.asarray(y)
+        self.success = True
+        self.message = "Integration successful."
@@ -0,0 +1,127 @@
+import unittest
+import numpy as np
+from plasmaSpice.core.circuit import Circuit
+from plasmaSpice.core.assembly import NodeMap, PatternCache, TripletMatrix, node_indices
+from plasmaSpice.core.elements import (Component, VoltageSource, CurrentSource,
+                                       Resistor, Capacitor, Inductor)
+
+
+def build_ladder():
+    """RLC ladder with grounded and floating elements of every type"""
+    ckt = Circuit()
+    ckt.add_element(VoltageSource("V1", 1, 0, 10.0))
+    ckt.add_element(VoltageSource("V2", 3, 2, 1.5))
+    ckt.add_element(CurrentSource("I1", 4, 0, 2e-3))
+    ckt.add_element(CurrentSource("I2", 2, 5, 1e-3))
+    for k in range(1, 6):
+        ckt.add_element(Resistor(f"R{k}", k, k + 1, 100.0 * k))
+        ckt.add_element(Resistor(f"Rg{k}", k + 1, 0, 1e3 * k))
+        ckt.add_element(Capacitor(f"C{k}", k + 1, 0, 1e-9 * k))
+    ckt.add_element(Capacitor("Cf", 2, 4, 5e-10))
+    ckt.add_element(Inductor("L1", 4, 6, 1e-6))
+    ckt.add_element(Inductor("L2", 6, 0, 2e-6))
+    return ckt
+
+
+class TestVectorizedStamps(unittest.TestCase):
+    def setUp(self):
+        self.ckt = build_ladder()
+        n_nodes, n_currents = self.ckt._build_maps()
+        self.size = n_nodes + n_currents
+        self.groups = self.ckt._group_by_type()
+
+    def test_dc_stamps_match_per_element(self):
+        """Vectorized DC stamps produce the same matrix and RHS"""
+        ckt = self.ckt
+        for cls, group in self.groups.items():
+            ref, ref_vec = TripletMatrix(self.size), np.zeros(self.size)
+            vec, vec_vec = TripletMatrix(self.size), np.zeros(self.size)
+            Component.stamp_many.__func__(cls, group, ref, ref_vec, ckt.node_map, ckt.vsrc_map)
+            cls.stamp_many(group, vec, vec_vec, ckt.node_map, ckt.vsrc_map)
+            np.testing.assert_allclose(vec.tocsr().toarray(), ref.tocsr().toarray(),
+                                       err_msg=cls.__name__)
+            np.testing.assert_allclose(vec_vec, ref_vec, err_msg=cls.__name__)
+
+    def test_dae_stamps_match_per_element(self):
+        """Vectorized DAE stamps produce the same A, B and C"""
+        ckt = self.ckt
+        for cls, group in self.groups.items():
+            ref = (TripletMatrix(self.size), TripletMatrix(self.size), np.zeros(self.size))
+            vec = (TripletMatrix(self.size), TripletMatrix(self.size), np.zeros(self.size))
+            Component.stamp_dae_many.__func__(cls, group, *ref, ckt.node_map, ckt.vsrc_map)
+            cls.stamp_dae_many(group, *vec, ckt.node_map, ckt.vsrc_map)
+            for r, v in zip(ref[:2], vec[:2]):
+                np.testing.assert_allclose(v.tocsr().toarray(), r.tocsr().toarray(),
+                                           err_msg=cls.__name__)
+            np.testing.assert_allclose(vec[2], ref[2], err_msg=cls.__name__)
+    def test_index_arrays_cached_per_topology(self):
+        """Index arrays are reused until an element is added"""
+        ckt = self.ckt
+        resistors = self.groups[Resistor]
+        first = node_indices(resistors, ckt.node_map)
+        self.assertIs(node_indices(resistors, ckt.node_map), first)
+
+        ckt.add_element(Resistor("R9", 6, 7, 10.0))
+        ckt._build_maps()
+        entrance, exit = node_indices(resistors, ckt.node_map)
+        self.assertEqual(entrance.size, first[0].size + 1)
+        self.assertEqual(exit[-1], ckt.node_map[7])
+
+
+class TestNodeMap(unittest.TestCase):
+    def test_sparse_and_negative_numbers(self):
+        """Huge and negative node numbers map without a dense table"""
+        node_map = NodeMap([-7, 3, 10**9])
+        np.testing.assert_array_equal(
+            node_map.indices([10**9, 0, -7, 3, 5, 2 * 10**9, -8]),
+            [2, -1, 0, 1, -1, -1, -1])
+
+    def test_string_labels(self):
+        """Non-integer labels fall back to the dict"""
+        node_map = NodeMap(['in', 'mid', 'out'])
+        np.testing.assert_array_equal(node_map.indices(['out', 0, 'in', 'x']),
+                                      [2, -1, 0, -1])
+        np.testing.assert_array_equal(NodeMap([]).indices([0, 4]), [-1, -1])
+
+    def test_circuit_with_labelled_nodes(self):
+        """Circuits solve with string and sparse node labels"""
+        for top, mid in (('in', 'mid'), (10**9, -5)):
+            ckt = Circuit()
+            ckt.add_elements([VoltageSource("V1", top, 0, 10.0),
+                              Resistor("R1", top, mid, 1000),
+                              Resistor("R2", mid, 0, 3000),
+                              Resistor("R3", mid, 0, 3000)])
+            self.assertTrue(ckt.validate_circuit())
+            result = ckt.solve_dc()
+            self.assertAlmostEqual(result[f"V{top}"], 10.0)
+            self.assertAlmostEqual(result[f"V{mid}"], 6.0)
+
+
+class TestPatternCache(unittest.TestCase):
+    def coordinates(self, n):
+        rows = np.repeat(np.arange(n), 2)
+        return rows, (rows + np.tile([0, 1], n)) % n
+
+    def test_shared_structure_and_byte_bound(self):
+        """Equal coordinates share arrays; the total size stays under the bound"""
+        cache = PatternCache(max_bytes=2**20)
+        rows, cols = self.coordinates(50)
+        first = cache.get(rows, cols, (50, 50))
+        second = cache.get(rows.copy(), cols.copy(), (50, 50))
+        self.assertIsNot(first, second)
+        self.assertIs(first.slot, second.slot)
+
+        cache.max_bytes = cache.nbytes * 2
+        for n in (60, 70, 80):
+            cache.get(*self.coordinates(n), (n, n))
+            self.assertLessEqual(cache.nbytes, cache.max_bytes)
+        self.assertLess(len(cache), 4)
+
+        cache.clear()
+        cache.max_bytes = 0
+        cache.get(rows, cols, (50, 50))
+        self.assertEqual((len(cache), cache.nbytes), (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
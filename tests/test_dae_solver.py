@@ -1,14 +1,17 @@
 import unittest
 import numpy as np
-import matplotlib.pyplot as plt
 import os
+from unittest import mock
+from plasmaSpice.core import dae_solver
+from plasmaSpice.core.circuit import Circuit
 from plasmaSpice.core.dae_solver import DAESolver
+from plasmaSpice.core.elements import VoltageSource, Resistor, Capacitor, Inductor
 
 class TestDAESolver(unittest.TestCase):
-    def setUp(self):
-        self.output_dir = 'test_outputs'
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+    @classmethod
+    def setUpClass(cls):
+        cls.output_dir = 'test_outputs'
+        os.makedirs(cls.output_dir, exist_ok=True)
             
     # def test_series_lc_branch_circuit(self):
     #     """Test circuit with series LC branch using IDA solver"""
@@ -99,36 +102,31 @@ class TestDAESolver(unittest.TestCase):
         Cs = 2e-10    # Capacitance (F)
         Rs = 0.5      # Resistance (Ω)
         
+        # Same circuit through the automatic DAE construction; state order
+        # [v1, v2, v3, v4, v5, v6, iV1, iL1]
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, V))
+        ckt.add_element(Resistor("R1", 1, 2, R1))
+        ckt.add_element(Capacitor("Cm1", 2, 0, Cm1))
+        ckt.add_element(Capacitor("Cm2", 2, 3, Cm2))
+        ckt.add_element(Inductor("Lm", 3, 4, Lm))
+        ckt.add_element(Resistor("Rm", 4, 5, Rm))
+        ckt.add_element(Capacitor("Cs", 5, 6, Cs))
+        ckt.add_element(Resistor("Rs", 6, 0, Rs))
+        A, B, C = ckt.build_dae_system()[:3]
+        # n = 8: dense products are cheaper than sparse matvec dispatch
+        A, B = A.toarray(), B.toarray()
+        
+        # Residual buffers allocated once, not on every IDA call
+        res = np.empty(8)
+        By = np.empty(8)
+        
         def residual(t, y, yd):
-            """DAE system in residual form: 0 = F(t, y, y')"""
-            v1, v2, v3, v4, v5, v6, iV1, iL1 = y
-            dv1, dv2, dv3, dv4, dv5, dv6, diV1, diL1 = yd
-            
-            res = np.zeros(8)
-            # Node 1: Current of R1 - Voltage source current
-            res[0] = (v1-v2)/R1 - iV1
-            
-            # Node 2: KCL at Cm1-Cm2 junction
-            res[1] = Cm1*dv2 + Cm2*(dv2 - dv3) + (v2 - v1)/R1
-            
-            # Node 3: KCL at Cm2-L junction
-            res[2] = Cm2*(dv3 - dv2) + iL1
-            
-            # Node 4: KCL at L-Rm junction
-            res[3] = (v4 - v5)/Rm - iL1
-            
-            # Node 5: KCL at Rm-Cs junction
-            res[4] = Cs*(dv5 - dv6) + (v5 - v4)/Rm
-            
-            # Node 6: KCL at Cs-Rs junction
-            res[5] = Cs*(dv6 - dv5) + v6/Rs
-            
-            # Inductor equation
-            res[6] = (v3 -v4) - Lm*diL1
-            
-            # Voltage source equation
-            res[7] = v1 - V
-            
+            """DAE system in residual form: 0 = F(t, y, y') = A y' + B y + C"""
+            np.dot(A, yd, out=res)
+            np.dot(B, y, out=By)
+            np.add(res, By, out=res)
+            np.add(res, C, out=res)
             return res
         
         # Initial conditions
@@ -151,66 +149,97 @@ class TestDAESolver(unittest.TestCase):
         
         # Save solution data
         data_file = os.path.join(self.output_dir, 'solution_data_example.txt')
-        with open(data_file, 'w') as f:
-            f.write('# Time(s) v1(V) v2(V) v3(V) v4(V) v5(V) v6(V) iV1(A) iL1(A)\n')
-            for i in range(len(solution.t)):
-                f.write(f'{solution.t[i]:.6e} ')
-                for j in range(8):
-                    f.write(f'{solution.y[j,i]:.6e} ')
-                f.write('\n')
-                
-        # Load and plot data
-        data = np.loadtxt(os.path.join(self.output_dir, 'solution_data_example.txt'))
-        t = data[:,0]
-        v1 = data[:,1]
-        v2 = data[:,2]
-        v3 = data[:,3]
-        v4 = data[:,4]
-        v5 = data[:,5]
-        v6 = data[:,6]
-        iV1 = data[:,7]
-        iL1 = data[:,8]
-        
-        plt.figure(figsize=(12, 8))
-        
-        # Voltage plots
-        plt.subplot(211)
-        t_us = t * 1e6  # 转换为微秒
-        plt.plot(t_us, v1, 'k-', label='v1 (source)')
-        plt.plot(t_us, v2, 'r-', label='v2')
-        plt.plot(t_us, v3, 'g-', label='v3')
-        plt.plot(t_us, v4, 'b-', label='v4')
-        plt.plot(t_us, v5, 'm-', label='v5')
-        plt.plot(t_us, v6, 'c-', label='v6')
-        plt.grid(True)
-        plt.xlabel('Time (μs)')
-        plt.ylabel('Voltage (V)')
-        plt.title('Node Voltages')
-        plt.legend()
-        
-        # Current plot
-        plt.subplot(212)
-        plt.plot(t_us, iV1, 'r-', label='iV1 (source)')
-        plt.plot(t_us, iL1, 'b-', label='iL1 (inductor)')
-        plt.grid(True)
-        plt.xlabel('Time (μs)')
-        plt.ylabel('Current (A)')
-        plt.title('Branch Currents')
-        plt.legend()
-        
-        plt.tight_layout()
-        plt.savefig(os.path.join(self.output_dir, 'example_lc_response.png'))
-        plt.close()
+        np.savetxt(data_file, np.column_stack((solution.t, solution.y.T)), fmt='%.6e',
+                   header='Time(s) v1(V) v2(V) v3(V) v4(V) v5(V) v6(V) iV1(A) iL1(A)')
+        
+        # Plot straight from the solution
+        t = solution.t
+        v1, v2, v3, v4, v5, v6, iV1, iL1 = solution.y
+        
+        # Plots are optional: SKIP_PLOTS=1 skips matplotlib entirely
+        if not os.environ.get('SKIP_PLOTS'):
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            from matplotlib.collections import LineCollection
+            from matplotlib.lines import Line2D
+            
+            plt.figure(figsize=(12, 8))
+        
+            # Voltage plots
+            plt.subplot(211)
+            t_us = t * 1e6  # 转换为微秒
+            # All six node voltages in one collection, legend via proxies
+            colors = ['k', 'r', 'g', 'b', 'm', 'c']
+            labels = ['v1 (source)', 'v2', 'v3', 'v4', 'v5', 'v6']
+            ax = plt.gca()
+            ax.add_collection(LineCollection(
+                [np.column_stack((t_us, v)) for v in (v1, v2, v3, v4, v5, v6)], colors=colors))
+            ax.autoscale()
+            ax.legend(handles=[Line2D([], [], color=c, label=l)
+                               for c, l in zip(colors, labels)])
+            plt.grid(True)
+            plt.xlabel('Time (μs)')
+            plt.ylabel('Voltage (V)')
+            plt.title('Node Voltages')
+        
+            # Current plot
+            plt.subplot(212)
+            plt.plot(t_us, iV1, 'r-', label='iV1 (source)')
+            plt.plot(t_us, iL1, 'b-', label='iL1 (inductor)')
+            plt.grid(True)
+            plt.xlabel('Time (μs)')
+            plt.ylabel('Current (A)')
+            plt.title('Branch Currents')
+            plt.legend()
+        
+            plt.tight_layout()
+            plt.savefig(os.path.join(self.output_dir, 'example_lc_response.png'))
+            plt.close()
         
         # 打印残差函数的示例值
         y_test = np.array([V, 0, 0, 0, 0, 0, 0, 0])
         yd_test = np.zeros_like(y_test)
-        res_test = residual(0, y_test, yd_test)
+        res_test = residual(0, y_test, yd_test).copy()
         
         print("\nManual DAE System Test:")
         print("Test point y:", y_test)
         print("Test point yd:", yd_test)
         print("Residual:", res_test)
 
+    def test_analytic_jacobian_only_for_dense_systems(self):
+        """Small systems get the dense Jacobian; large ones allocate no n x n arrays"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 1.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1e3))
+        ckt.add_element(Capacitor("C1", 2, 0, 1e-6))
+        
+        for limit, dense in ((200, True), (0, False)):
+            with mock.patch.object(dae_solver, 'DENSE_RESIDUAL_MAX_SIZE', limit), \
+                 mock.patch.object(DAESolver, 'solve') as solve:
+                ckt.solve_dae((0, 1e-3), method='ida')
+            jac_fn = solve.call_args.kwargs['jac_fn']
+            if dense:
+                J = jac_fn(2.0, 0.0, None, None)
+                A, B = ckt.build_dae_system()[:2]
+                np.testing.assert_allclose(J, 2.0 * A.toarray() + B.toarray())
+            else:
+                self.assertIsNone(jac_fn)
+                self.assertIsNone(solve.call_args.args[0].J)
+
+    def test_single_precision_requires_ida(self):
+        """float32 system matrices are only accepted for the IDA residual"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 1.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1e3))
+        ckt.add_element(Capacitor("C1", 2, 0, 1e-6))
+        
+        for method in ('auto', 'expm'):
+            with self.assertRaises(ValueError):
+                ckt.solve_dae((0, 1e-3), precision='single', method=method)
+        with mock.patch.object(DAESolver, 'solve') as solve:
+            ckt.solve_dae((0, 1e-3), precision='single', method='ida')
+        self.assertEqual(solve.call_args.args[0].K.dtype, np.float32)
+
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -1,14 +1,14 @@
 import unittest
 import numpy as np
-import matplotlib.pyplot as plt
+import os
 from plasmaSpice.core.circuit import Circuit
 from plasmaSpice.core.elements import VoltageSource, Resistor, Capacitor, Inductor
 
 class TestDAESystem(unittest.TestCase):
-    def setUp(self):
-        self.output_dir = 'test_outputs'
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+    @classmethod
+    def setUpClass(cls):
+        cls.output_dir = 'test_outputs'
+        os.makedirs(cls.output_dir, exist_ok=True)
             
     def test_example_lc_branch_circuit(self):
         """Test complex RLC circuit with automatic DAE system construction"""
@@ -40,45 +40,49 @@ class TestDAESystem(unittest.TestCase):
         
         # Save and plot results
         data_file = os.path.join(self.output_dir, 'auto_dae_solution.txt')
-        with open(data_file, 'w') as f:
-            f.write('# Time(s) v1(V) v2(V) v3(V) v4(V) v5(V) v6(V) iV1(A) iL1(A)\n')
-            for i in range(len(solution.t)):
-                f.write(f'{solution.t[i]:.6e} ')
-                for j in range(8):
-                    f.write(f'{solution.y[j,i]:.6e} ')
-                f.write('\n')
+        np.savetxt(data_file, np.column_stack((solution.t, solution.y.T)), fmt='%.6e',
+                   header='Time(s) v1(V) v2(V) v3(V) v4(V) v5(V) v6(V) iV1(A) iL1(A)')
         
-        # Plot results
-        plt.figure(figsize=(12, 8))
+        # Plots are optional: SKIP_PLOTS=1 skips matplotlib entirely
+        if not os.environ.get('SKIP_PLOTS'):
+            import matplotlib
+            matplotlib.use('Agg')
+            import matplotlib.pyplot as plt
+            from matplotlib.collections import LineCollection
+            from matplotlib.lines import Line2D
+            
+            plt.figure(figsize=(12, 8))
         
-        # Voltage plots
-        plt.subplot(211)
-        t_us = solution.t * 1e6  # 转换为微秒
-        plt.plot(t_us, solution.y[0,:], 'k-', label='v1 (source)')
-        plt.plot(t_us, solution.y[1,:], 'r-', label='v2')
-        plt.plot(t_us, solution.y[2,:], 'g-', label='v3')
-        plt.plot(t_us, solution.y[3,:], 'b-', label='v4')
-        plt.plot(t_us, solution.y[4,:], 'm-', label='v5')
-        plt.plot(t_us, solution.y[5,:], 'c-', label='v6')
-        plt.grid(True)
-        plt.xlabel('Time (μs)')
-        plt.ylabel('Voltage (V)')
-        plt.title('Node Voltages')
-        plt.legend()
+            # Voltage plots
+            plt.subplot(211)
+            t_us = solution.t * 1e6  # 转换为微秒
+            # All six node voltages in one collection, legend via proxies
+            colors = ['k', 'r', 'g', 'b', 'm', 'c']
+            labels = ['v1 (source)', 'v2', 'v3', 'v4', 'v5', 'v6']
+            ax = plt.gca()
+            ax.add_collection(LineCollection(
+                [np.column_stack((t_us, v)) for v in solution.y[:6]], colors=colors))
+            ax.autoscale()
+            ax.legend(handles=[Line2D([], [], color=c, label=l)
+                               for c, l in zip(colors, labels)])
+            plt.grid(True)
+            plt.xlabel('Time (μs)')
+            plt.ylabel('Voltage (V)')
+            plt.title('Node Voltages')
         
-        # Current plot
-        plt.subplot(212)
-        plt.plot(t_us, solution.y[6,:], 'r-', label='iV1 (source)')
-        plt.plot(t_us, solution.y[7,:], 'b-', label='iL1 (inductor)')
-        plt.grid(True)
-        plt.xlabel('Time (μs)')
-        plt.ylabel('Current (A)')
-        plt.title('Branch Currents')
-        plt.legend()
+            # Current plot
+            plt.subplot(212)
+            plt.plot(t_us, solution.y[6,:], 'r-', label='iV1 (source)')
+            plt.plot(t_us, solution.y[7,:], 'b-', label='iL1 (inductor)')
+            plt.grid(True)
+            plt.xlabel('Time (μs)')
+            plt.ylabel('Current (A)')
+            plt.title('Branch Currents')
+            plt.legend()
         
-        plt.tight_layout()
-        plt.savefig(os.path.join(self.output_dir, 'auto_dae_response.png'))
-        plt.close()
+            plt.tight_layout()
+            plt.savefig(os.path.join(self.output_dir, 'auto_dae_response.png'))
+            plt.close()
         
         # Build DAE system
         A, B, C, y0, yd0, algvar_list = ckt.build_dae_system()
@@ -94,7 +98,7 @@ class TestDAESystem(unittest.TestCase):
         # Test same point as manual system
         y_test = np.array([V, 0, 0, 0, 0, 0, 0, 0])
         yd_test = np.zeros_like(y_test)
-        res_test = A @ yd_test - B @ y_test - C
+        res_test = A @ yd_test + B @ y_test + C
         
         print("\nTest point y:", y_test)
         print("Test point yd:", yd_test)
@@ -0,0 +1,244 @@
+import unittest
+import numpy as np
+from unittest import mock
+from plasmaSpice.core import circuit
+from plasmaSpice.core.assembly import PatternCache
+from plasmaSpice.core.circuit import Circuit
+from plasmaSpice.core.elements import (VoltageSource, CurrentSource, Resistor,
+                                       Capacitor, Inductor)
+
+
+def random_resistor_network(seed=0, n_nodes=30, n_resistors=90):
+    """Random resistive mesh with two voltage sources and a current source"""
+    rng = np.random.default_rng(seed)
+    ckt = Circuit()
+    ckt.add_element(VoltageSource("V1", 1, 0, 5.0))
+    ckt.add_element(VoltageSource("V2", 7, 3, 2.0))
+    ckt.add_element(CurrentSource("I1", 4, 0, 1e-3))
+    for k in range(n_resistors):
+        a, b = rng.choice(n_nodes + 1, size=2, replace=False)
+        ckt.add_element(Resistor(f"R{k}", int(max(a, b)), int(min(a, b)),
+                                 float(rng.uniform(10, 1000))))
+    for n in range(1, n_nodes + 1):
+        ckt.add_element(Resistor(f"Rg{n}", n, 0, 1e4))
+    return ckt
+
+
+def capacitor_island_circuit():
+    """Source, resistors and an inductor, with R3 isolated by capacitors"""
+    ckt = Circuit()
+    ckt.add_element(VoltageSource("V1", 1, 0, 5.0))
+    ckt.add_element(Resistor("R1", 1, 2, 1000))
+    ckt.add_element(Inductor("L1", 2, 3, 1e-3))
+    ckt.add_element(Resistor("R2", 3, 0, 1000))
+    ckt.add_element(Capacitor("C1", 3, 4, 1e-6))
+    ckt.add_element(Resistor("R3", 4, 5, 1000))
+    ckt.add_element(Capacitor("C2", 5, 0, 1e-6))
+    return ckt
+
+
+class TestDCSolve(unittest.TestCase):
+    def test_block_elimination_matches_dense_solve(self):
+        """Schur complement DC solve agrees with a dense solve of the MNA system"""
+        ckt = random_resistor_network()
+        result = ckt.solve_dc()
+
+        n_nodes, n_vsrc = ckt._build_maps()
+        matrix, vector = ckt._build_mna_matrix(n_nodes, n_vsrc)
+        expected = np.linalg.solve(matrix.toarray(), vector)
+
+        for node, idx in ckt.node_map.items():
+            self.assertAlmostEqual(result[f"V{node}"], expected[idx], places=9)
+        for src in ckt.voltage_sources:
+            self.assertAlmostEqual(result[f"I_{src.name}"], expected[ckt.vsrc_map[src]], places=12)
+
+    def test_mixed_precision_matches_double(self):
+        """float32 factorization with refinement reaches float64 accuracy"""
+        ckt = random_resistor_network()
+        expected = ckt.solve_dc()
+        result = ckt.solve_dc(precision='mixed')
+
+        for key, value in expected.items():
+            self.assertAlmostEqual(result[key], value, places=9)
+
+    def test_gmres_matches_direct(self):
+        """ILU preconditioned GMRES reaches the sparse LU solution"""
+        expected = random_resistor_network().solve_dc()
+        with mock.patch.object(circuit, '_factor', wraps=circuit._factor) as factor:
+            result = random_resistor_network().solve_dc(method='gmres')
+        factor.assert_not_called()
+
+        for key, value in expected.items():
+            self.assertAlmostEqual(result[key], value, places=9)
+
+    def test_nodes_held_by_sources_only(self):
+        """Nodes with a singular conductance block fall back to the full LU"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 5.0))
+        ckt.add_element(Resistor("R1", 1, 2, 100))
+        ckt.add_element(VoltageSource("V2", 2, 0, 2.0))
+
+        result = ckt.solve_dc()
+
+        self.assertAlmostEqual(result["V1"], 5.0)
+        self.assertAlmostEqual(result["V2"], 2.0)
+        # Source currents are positive when the source delivers power
+        self.assertAlmostEqual(result["I_V1"], 0.03)
+        self.assertAlmostEqual(result["I_V2"], -0.03)
+
+    def test_repeated_solve_reuses_pattern(self):
+        """A second solve reuses the cached sparsity pattern and sees new values"""
+        ckt = random_resistor_network()
+        first = ckt.solve_dc()
+        pattern = ckt._patterns['dc']
+
+        ckt.voltage_sources[0].voltage *= 2
+        ckt.voltage_sources[1].voltage *= 2
+        ckt.elements[2].current *= 2
+        second = ckt.solve_dc()
+
+        self.assertIs(ckt._patterns['dc'], pattern)
+        for key, value in first.items():
+            self.assertAlmostEqual(second[key], 2 * value, places=9)
+
+    def test_source_change_reuses_factorization(self):
+        """Only a changed matrix is refactored; new source values reuse the LU"""
+        ckt = random_resistor_network()
+        ckt.solve_dc()
+
+        ckt.voltage_sources[0].voltage *= 2
+        with mock.patch.object(circuit, '_factor', wraps=circuit._factor) as factor:
+            result = ckt.solve_dc()
+        factor.assert_not_called()
+
+        ckt.elements[3].resistance *= 2
+        with mock.patch.object(circuit, '_factor', wraps=circuit._factor) as factor:
+            changed = ckt.solve_dc()
+        factor.assert_called()
+
+        n_nodes, n_vsrc = ckt._build_maps()
+        matrix, vector = ckt._build_mna_matrix(n_nodes, n_vsrc)
+        expected = np.linalg.solve(matrix.toarray(), vector)
+        for node, idx in ckt.node_map.items():
+            self.assertAlmostEqual(changed[f"V{node}"], expected[idx], places=9)
+        self.assertNotAlmostEqual(result["V4"], changed["V4"])
+
+    def test_pattern_shared_between_circuits(self):
+        """With a byte budget, circuits of the same topology share the CSR structure"""
+        def solve_pair():
+            first = random_resistor_network()
+            second = random_resistor_network()
+            second.voltage_sources[0].voltage = 1.0
+            first.solve_dc()
+            result = second.solve_dc()
+            self.assertNotAlmostEqual(result["V1"], 5.0)
+            return first._patterns['dc'], second._patterns['dc']
+
+        shared, own = solve_pair()
+        self.assertIsNot(shared.slot, own.slot)
+
+        with mock.patch.object(circuit, 'shared_patterns', PatternCache(max_bytes=2**20)):
+            shared, own = solve_pair()
+        self.assertIsNot(shared, own)
+        self.assertIs(shared.slot, own.slot)
+        self.assertIs(shared.indices, own.indices)
+
+    def test_nodes_kept_sorted(self):
+        """Nodes stay sorted; node_map is rebuilt only when a node is added"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 5, 0, 1.0))
+        ckt.add_element(Resistor("R1", 5, 2, 10.0))
+        ckt.add_element(Resistor("R2", 9, 2, 10.0))
+        self.assertEqual(ckt.nodes, [2, 5, 9])
+
+        ckt.solve_dc()
+        node_map = ckt.node_map
+        ckt.add_element(Resistor("R3", 9, 0, 10.0))
+        ckt.solve_dc()
+        self.assertIs(ckt.node_map, node_map)
+
+        ckt.add_element(Resistor("R4", 9, 7, 10.0))
+        ckt.solve_dc()
+        self.assertEqual(ckt.nodes, [2, 5, 7, 9])
+        self.assertEqual(dict(ckt.node_map), {2: 0, 5: 1, 7: 2, 9: 3})
+
+    def test_add_elements_matches_add_element(self):
+        """Bulk insertion gives the same nodes and DC solution"""
+        ref = random_resistor_network()
+        bulk = Circuit()
+        bulk.add_elements(ref.elements[:40])
+        bulk.add_elements(ref.elements[40:])
+
+        self.assertEqual(bulk.nodes, ref.nodes)
+        self.assertEqual(bulk.solve_dc(), ref.solve_dc())
+
+    def test_add_resistors_matches_add_element(self):
+        """Array-based resistor insertion gives the same nodes and DC solution"""
+        ref = random_resistor_network()
+        resistors = [e for e in ref.elements if isinstance(e, Resistor)]
+        bulk = Circuit()
+        bulk.add_elements(e for e in ref.elements if not isinstance(e, Resistor))
+        added = bulk.add_resistors([r.name for r in resistors],
+                                   [r.entrance for r in resistors],
+                                   [r.exit for r in resistors],
+                                   [r.resistance for r in resistors])
+
+        self.assertEqual([r.name for r in added], [r.name for r in resistors])
+        self.assertEqual(bulk.nodes, ref.nodes)
+        result = bulk.solve_dc()
+        for key, value in ref.solve_dc().items():
+            self.assertAlmostEqual(result[key], value, places=9)
+
+    def test_inductor_is_zero_volt_source(self):
+        """Inductors short their nodes and report their DC current"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 10.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1000))
+        ckt.add_element(Inductor("L1", 2, 3, 1e-3))
+        ckt.add_element(Resistor("R2", 3, 0, 1000))
+
+        result = ckt.solve_dc()
+
+        self.assertAlmostEqual(result["V2"], 5.0)
+        self.assertAlmostEqual(result["V3"], 5.0)
+        self.assertAlmostEqual(result["I_L1"], 5e-3)
+
+    def test_capacitor_island_uses_gmin(self):
+        """Nodes reached only through capacitors are held by gmin"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 10.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1000))
+        ckt.add_element(Capacitor("C1", 2, 3, 1e-9))
+        ckt.add_element(Resistor("R2", 3, 4, 1000))
+
+        with self.assertLogs('plasmaSpice.core.circuit', level='WARNING'):
+            result = ckt.solve_dc()
+
+        self.assertAlmostEqual(result["V2"], 10.0)
+        self.assertAlmostEqual(result["V3"], 0.0)
+        self.assertAlmostEqual(result["V4"], 0.0)
+
+    def test_mixed_precision_with_gmin(self):
+        """A GMIN system singular in float32 falls back to the float64 solve"""
+        with self.assertLogs('plasmaSpice.core.circuit', level='WARNING'):
+            expected = capacitor_island_circuit().solve_dc()
+            result = capacitor_island_circuit().solve_dc(precision='mixed')
+
+        for key, value in expected.items():
+            self.assertAlmostEqual(result[key], value, places=9)
+        self.assertAlmostEqual(result["I_L1"], 2.5e-3)
+
+    def test_gmin_system_is_not_block_eliminated(self):
+        """The GMIN-regularized system is factored whole, keeping full accuracy"""
+        ckt = capacitor_island_circuit()
+        with self.assertLogs('plasmaSpice.core.circuit', level='WARNING'):
+            ckt.solve_dc()
+            ckt.elements[1].resistance = 2000
+            result = ckt.solve_dc()
+
+        self.assertEqual(result["V1"], 5.0)
+        self.assertAlmostEqual(result["V2"], result["V3"], places=12)
+        self.assertAlmostEqual(result["I_L1"], 5.0 / 3000, places=9)
+
+if __name__ == '__main__':
+    unittest.main()
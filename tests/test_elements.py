@@ -1,10 +1,22 @@
 import unittest
+import numpy as np
 from plasmaSpice.core.circuit import Circuit
 from plasmaSpice.core.elements import Capacitor, VoltageSource, Resistor, Inductor
 
 def main():
     unittest.main()
 
+class TestResistor(unittest.TestCase):
+    def test_from_conductance(self):
+        """Resistors built from a conductance behave like ones built from R"""
+        r = Resistor.from_conductance("R1", 1, 0, 0.004)
+        self.assertEqual((r.name, r.entrance, r.exit), ("R1", 1, 0))
+        self.assertAlmostEqual(r.resistance, 250.0)
+        
+        # Changing the resistance updates the stamped conductance
+        r.resistance = 500.0
+        self.assertAlmostEqual(r.conductance, 0.002)
+
 class TestCapacitor(unittest.TestCase):
     def test_dc_open_circuit(self):
         """Test that capacitor acts as open circuit in DC"""
@@ -47,6 +59,28 @@ class TestCapacitor(unittest.TestCase):
         voltage = cap.get_voltage(result)
         self.assertAlmostEqual(voltage, 10.0)
 
+    def test_vectorized_voltages_match_get_voltage(self):
+        """Circuit.capacitor_voltages agrees with get_voltage per capacitor"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 10.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1000))
+        ckt.add_element(Resistor("R2", 2, 0, 3000))
+        caps = [Capacitor("C1", 2, 0, 1e-6), Capacitor("C2", 1, 2, 1e-6),
+                Capacitor("C3", 0, 1, 1e-6)]
+        for cap in caps:
+            ckt.add_element(cap)
+        
+        result = ckt.solve_dc()
+        x = np.zeros(len(ckt.nodes) + len(ckt.vsrc_map))
+        for node, idx in ckt.node_map.items():
+            x[idx] = result[f"V{node}"]
+        
+        expected = [cap.get_voltage(result) for cap in caps]
+        np.testing.assert_allclose(ckt.capacitor_voltages(x), expected)
+        # Trajectories (n_states, n_times) give one row per capacitor
+        np.testing.assert_allclose(ckt.capacitor_voltages(np.column_stack([x, 2 * x])),
+                                   np.column_stack([expected, 2 * np.array(expected)]))
+
 class TestInductor(unittest.TestCase):
     def test_dc_short_circuit(self):
         """Test that inductor acts as short circuit in DC"""
@@ -83,6 +117,9 @@ class TestInductor(unittest.TestCase):
         # - All voltage drops across resistor
         # - Node 2 should be at 0V
         self.assertAlmostEqual(result["V2"], 0.0)
+        
+        # Inductor carries the full divider current
+        self.assertAlmostEqual(ind.get_current(result), 0.01)
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,77 @@
+import sys
+import unittest
+from unittest import mock
+import numpy as np
+from plasmaSpice.core.circuit import Circuit
+from plasmaSpice.core.elements import VoltageSource, Resistor, Capacitor, Inductor
+from plasmaSpice.core.linear_dae import solve_linear_dae
+
+
+class TestLinearDAE(unittest.TestCase):
+    def test_rc_charging(self):
+        """RC step response matches 1 - exp(-t/RC)"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 1.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1e3))
+        ckt.add_element(Capacitor("C1", 2, 0, 1e-6))
+        A, B, C, y0, yd0, algvar = ckt.build_dae_system()
+
+        t, y = solve_linear_dae(A, B, C, y0, (0, 5e-3), 500)
+
+        self.assertEqual(y.shape, (3, 501))
+        np.testing.assert_allclose(y[0], 1.0, atol=1e-12)
+        np.testing.assert_allclose(y[1], 1 - np.exp(-t / 1e-3), atol=1e-12)
+
+    def test_rl_current(self):
+        """RL inductor current matches V/R * (1 - exp(-t R/L))"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 2.0))
+        ckt.add_element(Resistor("R1", 1, 2, 10.0))
+        ckt.add_element(Inductor("L1", 2, 0, 1e-3))
+        A, B, C, y0, yd0, algvar = ckt.build_dae_system()
+
+        t, y = solve_linear_dae(A, B, C, y0, (0, 5e-4), 100)
+
+        i_l = y[ckt.vsrc_map[ckt.elements[2]]]
+        np.testing.assert_allclose(i_l, 0.2 * (1 - np.exp(-t * 1e4)), atol=1e-12)
+
+    def test_widely_separated_c_and_l(self):
+        """A 1 fF capacitor next to a 10 mH inductor stays differential"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 1.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1e9))
+        ckt.add_element(Capacitor("C1", 2, 0, 1e-15))
+        ckt.add_element(Inductor("L1", 1, 3, 10e-3))
+        ckt.add_element(Resistor("R2", 3, 0, 1e3))
+        A, B, C, y0, yd0, algvar = ckt.build_dae_system()
+
+        t, y = solve_linear_dae(A, B, C, y0, (0, 5e-6), 500)
+
+        np.testing.assert_allclose(y[1], 1 - np.exp(-t / 1e-6), atol=1e-9)
+        i_l = y[ckt.vsrc_map[ckt.elements[3]]]
+        np.testing.assert_allclose(i_l, 1e-3 * (1 - np.exp(-t * 1e5)), atol=1e-12)
+
+    def test_higher_index_is_rejected(self):
+        """An index-2 system (singular algebraic block) is left to IDA"""
+        A = np.array([[1.0, 0.0], [0.0, 0.0]])
+        B = np.array([[0.0, 1.0], [1.0, 0.0]])
+        C = np.array([0.0, -1.0])
+
+        self.assertIsNone(solve_linear_dae(A, B, C, np.zeros(2), (0, 1.0), 10))
+
+    def test_expm_path_does_not_import_assimulo(self):
+        """solve_dae(method='expm') runs without Assimulo installed"""
+        ckt = Circuit()
+        ckt.add_element(VoltageSource("V1", 1, 0, 1.0))
+        ckt.add_element(Resistor("R1", 1, 2, 1e3))
+        ckt.add_element(Capacitor("C1", 2, 0, 1e-6))
+
+        blocked = {'assimulo': None, 'assimulo.problem': None,
+                   'assimulo.solvers': None, 'plasmaSpice.core.dae_solver': None}
+        with mock.patch.dict(sys.modules, blocked):
+            solution = ckt.solve_dae((0, 5e-3), method='expm')
+        np.testing.assert_allclose(solution.y[1], 1 - np.exp(-solution.t / 1e-3),
+                                   atol=1e-12)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,29 +11,38 @@ This test verifies:
 import sys
 import os
 import numpy as np
+import pytest
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from plasmaSpice.core.circuit import Circuit
 from plasmaSpice.core.elements import Resistor, VoltageSource
 
-def test_voltage_divider():
+# (V, R1, R2, expected V2)
+DIVIDER_CASES = [
+    (5.0, 1000, 1000, 2.5),
+    (10.0, 1000, 1000, 5.0),
+    (12.0, 1000, 3000, 9.0),
+]
+
+@pytest.mark.parametrize("V,R1,R2,expected", DIVIDER_CASES)
+def test_voltage_divider(V, R1, R2, expected):
     """
     Test a simple voltage divider circuit:
     
-    V1 (5V)
+    V1 (V)
     |
-    R1 (1kΩ)
+    R1
     |
-    Node 2 (should be 2.5V)
+    Node 2 (should be V * R2 / (R1 + R2))
     |
-    R2 (1kΩ)
+    R2
     |
     GND
     
     Expected results:
-    - V1 = 5V (node 1)
-    - V2 = 2.5V (node 2)
-    - I = 2.5mA (through both resistors)
+    - V1 = V (node 1)
+    - V2 = expected (node 2)
+    - I = V / (R1 + R2) (through both resistors)
     """
     print("\n=== Testing Voltage Divider Circuit ===")
     
@@ -44,17 +53,17 @@ def test_voltage_divider():
     # Add components
     print("\n2. Adding circuit elements:")
     
-    v1 = VoltageSource("V1", 1, 0, 5.0)
+    v1 = VoltageSource("V1", 1, 0, V)
     ckt.add_element(v1)
-    print("- Added voltage source V1: 5V between nodes 1 and 0 (ground)")
+    print(f"- Added voltage source V1: {V}V between nodes 1 and 0 (ground)")
     
-    r1 = Resistor("R1", 1, 2, 1000)
+    r1 = Resistor("R1", 1, 2, R1)
     ckt.add_element(r1)
-    print("- Added resistor R1: 1kΩ between nodes 1 and 2")
+    print(f"- Added resistor R1: {R1}Ω between nodes 1 and 2")
     
-    r2 = Resistor("R2", 2, 0, 1000)
+    r2 = Resistor("R2", 2, 0, R2)
     ckt.add_element(r2)
-    print("- Added resistor R2: 1kΩ between node 2 and ground")
+    print(f"- Added resistor R2: {R2}Ω between node 2 and ground")
     
     # Verify circuit construction
     print("\n3. Verifying circuit construction:")
@@ -75,29 +84,30 @@ def test_voltage_divider():
     i_source = result["I_V1"]
     
     print(f"Node voltages:")
-    print(f"- V1: {v_node1:.6f}V (expected: 5.000000V)")
-    print(f"- V2: {v_node2:.6f}V (expected: 2.500000V)")
+    i_expected = V / (R1 + R2)
+    print(f"- V1: {v_node1:.6f}V (expected: {V:.6f}V)")
+    print(f"- V2: {v_node2:.6f}V (expected: {expected:.6f}V)")
     print(f"Source current:")
-    print(f"- I_V1: {i_source*1000:.6f}mA (expected: 2.500000mA)")
+    print(f"- I_V1: {i_source*1000:.6f}mA (expected: {i_expected*1000:.6f}mA)")
     
     # Voltage tests
-    assert abs(v_node1 - 5.0) < 1e-10, f"Node 1 voltage error: {abs(v_node1 - 5.0)}V"
-    assert abs(v_node2 - 2.5) < 1e-10, f"Node 2 voltage error: {abs(v_node2 - 2.5)}V"
+    assert abs(v_node1 - V) < 1e-10, f"Node 1 voltage error: {abs(v_node1 - V)}V"
+    assert abs(v_node2 - expected) < 1e-10, f"Node 2 voltage error: {abs(v_node2 - expected)}V"
     print("- Node voltages verified")
     
     # Current test
-    assert abs(i_source - 0.0025) < 1e-10, f"Source current error: {abs(i_source - 0.0025)}A"
+    assert abs(i_source - i_expected) < 1e-10, f"Source current error: {abs(i_source - i_expected)}A"
     print("- Source current verified")
     
     # Verify Kirchhoff's Voltage Law (KVL)
     v_r1 = v_node1 - v_node2  # Voltage across R1
     v_r2 = v_node2 - 0        # Voltage across R2
-    assert abs(v_r1 + v_r2 - 5.0) < 1e-10, "KVL error"
+    assert abs(v_r1 + v_r2 - V) < 1e-10, "KVL error"
     print("- Kirchhoff's Voltage Law verified")
     
     # Verify Kirchhoff's Current Law (KCL)
-    i_r1 = v_r1 / 1000  # Current through R1
-    i_r2 = v_r2 / 1000  # Current through R2
+    i_r1 = v_r1 / R1  # Current through R1
+    i_r2 = v_r2 / R2  # Current through R2
     assert abs(i_r1 - i_r2) < 1e-10, "KCL error"
     assert abs(i_r1 - i_source) < 1e-10, "Current continuity error"
     print("- Kirchhoff's Current Law verified")
@@ -105,4 +115,5 @@ def test_voltage_divider():
     print("\nTest passed! Voltage divider circuit working correctly.")
 
 if __name__ == "__main__":
-    test_voltage_divider() 
\ No newline at end of file
+    for case in DIVIDER_CASES:
+        test_voltage_divider(*case) 
\ No newline at end of file